@@ -0,0 +1,507 @@
+import dataclasses
+import functools
+import typing
+
+import numpy
+
+from .level import Level
+from .matrix import Matrix
+from .regex_ast import count_backreferences
+from .solver import INPUT_ALPHABET, NFA_CACHE_SIZE, Domain, LineNFA, Solver, _Line
+
+WORD_BITS = 64  # Bits in each of the words a domain is split into.
+DOMAIN_WORDS = -(-len(INPUT_ALPHABET) // WORD_BITS)  # Number of words a domain is split into.
+BATCH_SIZE = 256  # Most grids propagated together, bounding the size of the arrays.
+MAX_BRANCHES = 256  # Most guesses made on a single level before leaving it to `Solver`.
+MIN_SEARCHING_SHARE = 0.125  # Share of levels still searched below which the rest go to `Solver`.
+BYTE_BITS = numpy.array(
+    [bin(byte).count('1') for byte in range(256)], dtype=numpy.uint8
+)  # Number of set bits in each byte, to count the characters of many domains at once.
+
+NFAArrays = typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]
+Domains = numpy.ndarray  # The domain of each cell of a grid, as a row of words per cell.
+
+
+def _to_words(domain: int) -> typing.List[int]:
+    """
+    Split a domain into words, least significant first.
+
+    :param domain: the domain to split.
+    :type domain: int
+    :return: list of `DOMAIN_WORDS` words.
+    :rtype: typing.List[int]
+    """
+    return [domain >> (WORD_BITS * i) & (1 << WORD_BITS) - 1 for i in range(DOMAIN_WORDS)]
+
+
+def _from_words(words: typing.Iterable[int]) -> int:
+    """
+    Join words back into a domain (the opposite of `_to_words`).
+
+    :param words: the words of the domain, least significant first.
+    :type words: typing.Iterable[int]
+    :return: the domain.
+    :rtype: int
+    """
+    return sum(int(word) << (WORD_BITS * i) for i, word in enumerate(words))
+
+
+def _count_bits(domains: Domains) -> numpy.ndarray:
+    """
+    Count the characters each domain allows.
+
+    :param domains: the domains to count.
+    :type domains: Domains
+    :return: array of the number of set bits in each row.
+    :rtype: numpy.ndarray
+    """
+    return BYTE_BITS[domains.view(numpy.uint8)].sum(axis=1, dtype=numpy.int64)
+
+
+def _group_starts(keys: numpy.ndarray) -> numpy.ndarray:
+    """
+    Return where each run of equal keys starts, to reduce the values of every key with `reduceat`.
+
+    :param keys: sorted keys.
+    :type keys: numpy.ndarray
+    :return: array of the index of the first occurrence of each key.
+    :rtype: numpy.ndarray
+    """
+    starts = numpy.ones(len(keys), dtype=bool)
+    numpy.not_equal(keys[1:], keys[:-1], out=starts[1:])
+    return numpy.flatnonzero(starts)
+
+
+@functools.lru_cache(maxsize=NFA_CACHE_SIZE)
+def _nfa_arrays(nfa: LineNFA) -> NFAArrays:
+    """
+    Convert the transitions of an automaton into arrays, reusing the ones of previous lines.
+
+    :param nfa: the automaton to convert.
+    :type nfa: LineNFA
+    :return: tuple of the transitions' sources, targets and masks (one row of words per transition),
+        and whether each state is accepting.
+    :rtype: NFAArrays
+    """
+    edges = [
+        (state, target, _to_words(mask))
+        for state, transitions in enumerate(nfa.transitions)
+        for mask, target in transitions
+    ]
+    sources = numpy.array([source for source, _, _ in edges], dtype=numpy.int64)
+    targets = numpy.array([target for _, target, _ in edges], dtype=numpy.int64)
+    masks = numpy.array([words for _, _, words in edges], dtype=numpy.uint64).reshape(
+        len(edges), DOMAIN_WORDS
+    )
+    accepting = numpy.zeros(len(nfa.transitions), dtype=bool)
+    accepting[list(nfa.accepting)] = True
+    return sources, targets, masks, accepting
+
+
+@functools.lru_cache(maxsize=NFA_CACHE_SIZE)
+def _uses_backreferences(pattern: str) -> bool:
+    """
+    Check if a pattern uses backreferences, reusing the answer for patterns seen before.
+
+    :param pattern: the regex pattern to inspect.
+    :type pattern: str
+    :return: True if the pattern's automaton approximates a backreference, False otherwise.
+    :rtype: bool
+    """
+    return count_backreferences(pattern) > 0
+
+
+@dataclasses.dataclass
+class _LevelArrays:
+    """
+    Dataclass for storing the automatons of every line of a level as arrays,
+    numbering the states of all of them and the level's cells from 0.
+    """
+
+    sources: numpy.ndarray  # The state each transition leaves.
+    targets: numpy.ndarray  # The state each transition enters.
+    masks: numpy.ndarray  # The characters each transition reads, as a row of words.
+    accepting: numpy.ndarray  # Whether each state is accepting.
+    starts: numpy.ndarray  # The start state of each automaton.
+    state_lines: numpy.ndarray  # The automaton each state belongs to.
+    line_cells: numpy.ndarray  # The cells each automaton reads, padded with -1.
+    line_lengths: numpy.ndarray  # The number of cells each automaton reads.
+    cells: int  # Number of cells in the level.
+    checked_lines: typing.List[
+        typing.Tuple[numpy.ndarray, typing.Tuple[typing.Pattern, ...]]
+    ]  # The cells and regexes of the lines using backreferences, which the automatons approximate.
+
+    @classmethod
+    def from_level(cls, level: Level) -> '_LevelArrays':
+        """
+        Lay the automatons of a level's lines side by side.
+
+        :param level: the level to convert.
+        :type level: Level
+        :return: the level's arrays.
+        :rtype: _LevelArrays
+        """
+        cell_indexes = {cell: i for i, cell in enumerate(level.topology.cells)}
+        parts: typing.List[NFAArrays] = []
+        starts, state_lines, line_cells, checked_lines = [], [], [], []
+        states = 0
+        for line in level.topology.lines:
+            if any(_uses_backreferences(regex.pattern) for regex in line.regexes):
+                checked_lines.append(
+                    (numpy.array([cell_indexes[cell] for cell in line.cells]), line.regexes)
+                )
+            for nfa in _Line(line, INPUT_ALPHABET).nfas:
+                sources, targets, masks, accepting = _nfa_arrays(nfa)
+                parts.append((sources + states, targets + states, masks, accepting))
+                starts.append(states + nfa.start)
+                state_lines.append(numpy.full(len(accepting), len(line_cells)))
+                line_cells.append([cell_indexes[cell] for cell in line.cells])
+                states += len(accepting)
+        width = max(map(len, line_cells), default=0)
+        padded_cells = numpy.full((len(line_cells), width), -1)
+        for i, cells in enumerate(line_cells):
+            padded_cells[i, : len(cells)] = cells
+        sources, targets, masks, accepting = (
+            numpy.concatenate([part[i] for part in parts])
+            if parts
+            else numpy.zeros((0, DOMAIN_WORDS) if i == 2 else 0, dtype=dtype)
+            for i, dtype in enumerate((numpy.int64, numpy.int64, numpy.uint64, bool))
+        )
+        return cls(
+            sources=sources,
+            targets=targets,
+            masks=masks,
+            accepting=accepting,
+            starts=numpy.array(starts, dtype=numpy.int64),
+            state_lines=numpy.concatenate(state_lines)
+            if state_lines
+            else numpy.zeros(0, dtype=numpy.int64),
+            line_cells=padded_cells,
+            line_lengths=numpy.array([len(cells) for cells in line_cells], dtype=numpy.int64),
+            cells=len(cell_indexes),
+            checked_lines=checked_lines,
+        )
+
+    def initial_domains(self) -> Domains:
+        """
+        Return the domains of the level's cells before anything is known about them.
+        Cells that aren't part of any line can hold anything, so they get the first character.
+
+        :return: the initial domains.
+        :rtype: Domains
+        """
+        domains = numpy.empty((self.cells, DOMAIN_WORDS), dtype=numpy.uint64)
+        domains[:] = _to_words((1 << len(INPUT_ALPHABET)) - 1)
+        free = numpy.ones(self.cells, dtype=bool)
+        free[self.line_cells[self.line_cells >= 0]] = False
+        domains[free] = _to_words(1)
+        return domains
+
+
+class _Batch:
+    """
+    Class laying the automatons of every line of several grids (of the same level or not)
+    side by side, numbering all of their states, transitions, lines and cells from 0,
+    so the grids can be propagated together with a handful of array operations per cell position
+    instead of walking one automaton at a time.
+    """
+
+    def __init__(self, grids: typing.Sequence[_LevelArrays]):
+        state_offsets = numpy.cumsum([0] + [len(arrays.accepting) for arrays in grids])
+        line_offsets = numpy.cumsum([0] + [len(arrays.line_lengths) for arrays in grids])
+        self.cell_offsets = numpy.cumsum([0] + [arrays.cells for arrays in grids])
+        self.cells = int(self.cell_offsets[-1])
+        self.sources, self.targets, self.starts, self.state_lines = (
+            numpy.concatenate(
+                [getattr(arrays, name) + offsets[i] for i, arrays in enumerate(grids)]
+            )
+            for name, offsets in (
+                ('sources', state_offsets),
+                ('targets', state_offsets),
+                ('starts', state_offsets),
+                ('state_lines', line_offsets),
+            )
+        )
+        self.masks = numpy.concatenate([arrays.masks for arrays in grids])
+        line_lengths = numpy.concatenate([arrays.line_lengths for arrays in grids])
+        self.max_length = int(line_lengths.max(initial=0))
+        # Positions past the end of a line point at an extra cell whose domain is always empty,
+        # so no transition is taken there.
+        self.line_cells = numpy.full((int(line_offsets[-1]), self.max_length), self.cells)
+        for i, arrays in enumerate(grids):
+            rows = self.line_cells[line_offsets[i] : line_offsets[i + 1]]
+            rows[:, : arrays.line_cells.shape[1]] = numpy.where(
+                arrays.line_cells >= 0, arrays.line_cells + self.cell_offsets[i], self.cells
+            )
+        self.edge_lines = self.state_lines[self.sources]
+        self.edge_cells = self.line_cells[self.edge_lines]
+        self.accepting = numpy.flatnonzero(
+            numpy.concatenate([arrays.accepting for arrays in grids])
+        )
+        self.accepting_lengths = line_lengths[self.state_lines[self.accepting]]
+
+    def propagate(
+        self, grids: typing.Sequence[typing.Tuple[Domains, typing.Optional[int]]]
+    ) -> Domains:
+        """
+        Propagate the constraints of the batch's grids until none of their domains change.
+        Only the lines crossing a cell that changed are revised on each round.
+
+        :param grids: the domains of each grid, and the only cell that changed since they were
+            last propagated (None if they never were).
+        :type grids: typing.Sequence[typing.Tuple[Domains, typing.Optional[int]]]
+        :return: the propagated domains of the cells of every grid, one grid after the other
+            (see `cell_offsets`), some of a grid's domains empty if a contradiction was found in it.
+        :rtype: Domains
+        """
+        domains = numpy.concatenate(
+            [domains for domains, _ in grids] + [numpy.zeros((1, DOMAIN_WORDS), dtype=numpy.uint64)]
+        )
+        changed = numpy.zeros(self.cells + 1, dtype=bool)
+        for i, (_, cell) in enumerate(grids):
+            if cell is None:
+                changed[self.cell_offsets[i] : self.cell_offsets[i + 1]] = True
+            else:
+                changed[self.cell_offsets[i] + cell] = True
+        # Domains only shrink, so a transition that isn't on any accepted path at some position
+        # never will be again, and is left out of the next rounds.
+        candidates = numpy.ones((self.max_length, len(self.sources)), dtype=bool)
+        while True:
+            dirty = changed[self.line_cells].any(axis=1)
+            dirty_lines = numpy.flatnonzero(dirty)
+            dirty_edges = numpy.flatnonzero(dirty[self.edge_lines])
+            reached = numpy.zeros((self.max_length + 1, len(self.state_lines)), dtype=bool)
+            reached[0, self.starts[dirty_lines]] = True
+            for position in range(self.max_length):
+                taken = dirty_edges[candidates[position, dirty_edges]]
+                allowed = reached[position, self.sources[taken]]
+                allowed[allowed] = (
+                    self.masks[taken[allowed]] & domains[self.edge_cells[taken[allowed], position]]
+                ).any(axis=1)
+                candidates[position, taken[~allowed]] = False
+                reached[position + 1, self.targets[taken[allowed]]] = True
+            final = dirty[self.state_lines[self.accepting]]
+            final_lengths, final = self.accepting_lengths[final], self.accepting[final]
+            alive = numpy.zeros_like(reached)  # States on some path to an accepting state.
+            alive[final_lengths, final] = reached[final_lengths, final]
+            # What each dirty line allows at each of its positions; a line none of whose strings
+            # are accepted restricts its cells to nothing.
+            dirty_rows = numpy.zeros(len(dirty), dtype=numpy.int64)
+            dirty_rows[dirty_lines] = numpy.arange(len(dirty_lines))
+            restricted = numpy.zeros(
+                (len(dirty_lines), self.max_length, DOMAIN_WORDS), dtype=numpy.uint64
+            )
+            for position in range(self.max_length - 1, -1, -1):
+                taken = dirty_edges[candidates[position, dirty_edges]]
+                on_path = alive[position + 1, self.targets[taken]]
+                candidates[position, taken[~on_path]] = False
+                taken = taken[on_path]
+                alive[position, self.sources[taken]] = True
+                if len(taken):
+                    # The transitions are ordered by line, so each line's are next to each other.
+                    lines = self.edge_lines[taken]
+                    starts_of_lines = _group_starts(lines)
+                    restricted[dirty_rows[lines[starts_of_lines]], position] = (
+                        numpy.bitwise_or.reduceat(
+                            self.masks[taken] & domains[self.edge_cells[taken, position]],
+                            starts_of_lines,
+                        )
+                    )
+            # Each cell is narrowed by every dirty line crossing it.
+            cells = self.line_cells[dirty_lines].ravel()
+            order = numpy.argsort(cells, kind='stable')
+            cells = cells[order]
+            starts_of_cells = _group_starts(cells)
+            cells = cells[starts_of_cells]
+            narrowed = domains[cells] & numpy.bitwise_and.reduceat(
+                restricted.reshape(-1, DOMAIN_WORDS)[order], starts_of_cells
+            )
+            changed = numpy.zeros(self.cells + 1, dtype=bool)
+            changed[cells] = (narrowed != domains[cells]).any(axis=1)
+            changed[self.cells] = False
+            if not changed.any():
+                break
+            domains[cells] = narrowed
+        return domains[: self.cells]
+
+
+def _first_chars(domains: Domains) -> numpy.ndarray:
+    """
+    Return the index in the alphabet of the first character each domain allows,
+    which is its only character once the domain is settled.
+
+    :param domains: the domains to read.
+    :type domains: Domains
+    :return: array of the index of the least significant set bit of each row.
+    :rtype: numpy.ndarray
+    """
+    bits = numpy.unpackbits(domains.astype('<u8').view(numpy.uint8), axis=1, bitorder='little')
+    return bits.argmax(axis=1)
+
+
+def _check_lines(arrays: _LevelArrays, domains: Domains, counts: numpy.ndarray) -> bool:
+    """
+    Check the settled lines using backreferences against their actual regexes, like `Solver` does,
+    instead of finding out only once the whole grid is settled.
+
+    :param arrays: the arrays of the grid's level.
+    :type arrays: _LevelArrays
+    :param domains: the grid's domains.
+    :type domains: Domains
+    :param counts: the number of characters each of the grid's domains allows.
+    :type counts: numpy.ndarray
+    :return: False if a settled line doesn't match its regexes, True otherwise.
+    :rtype: bool
+    """
+    chars = None
+    for cells, regexes in arrays.checked_lines:
+        if (counts[cells] == 1).all():
+            if chars is None:
+                chars = _first_chars(domains)
+            line_str = ''.join([INPUT_ALPHABET[index] for index in chars[cells].tolist()])
+            if any(regex.fullmatch(line_str) is None for regex in regexes):
+                return False
+    return True
+
+
+def _read_solution(level: Level, domains: Domains) -> typing.Optional[Matrix]:
+    """
+    Turn the settled domains of a level's cells into a matrix.
+
+    :param level: the level the domains belong to.
+    :type level: Level
+    :param domains: the domain of each of the level's cells, each allowing a single character.
+    :type domains: Domains
+    :return: a matrix validated against the level, or None if it doesn't match the actual regexes.
+    :rtype: typing.Optional[Matrix]
+    """
+    matrix = level.create_matrix()
+    for (i, j), index in zip(level.topology.cells, _first_chars(domains).tolist()):
+        matrix[i][j] = INPUT_ALPHABET[index]
+    # Backreferences are only approximated by the automatons, so check the actual regexes too.
+    return matrix if level.check_matrix(matrix) else None
+
+
+def _next_guess(
+    guesses: typing.List[typing.Tuple[Domains, typing.Optional[int], Domain]]
+) -> typing.Tuple[Domains, typing.Optional[int]]:
+    """
+    Take the next guess off a level's stack: the first character not tried yet
+    of the last cell split on, with the grid's other domains left as they were.
+    The grids of the guesses are only created once they are tried, since most never are.
+
+    :param guesses: the level's stack of grids, the cell each was split on (None for the first grid)
+        and the characters of the cell not tried yet.
+    :type guesses: typing.List[typing.Tuple[Domains, typing.Optional[int], Domain]]
+    :return: tuple of the guess's domains and the only cell that changed (None for the first grid).
+    :rtype: typing.Tuple[Domains, typing.Optional[int]]
+    """
+    domains, cell, remaining = guesses.pop()
+    if cell is None:
+        return domains, None
+    bit = remaining & -remaining
+    if remaining != bit:
+        guesses.append((domains, cell, remaining ^ bit))
+    guess = domains.copy()
+    guess[cell] = _to_words(bit)
+    return guess, cell
+
+
+def solve_batch(
+    levels: typing.Sequence[Level],
+    *,
+    batch_size: int = BATCH_SIZE,
+    max_branches: int = MAX_BRANCHES,
+    min_searching_share: float = MIN_SEARCHING_SHARE,
+) -> typing.Tuple[typing.List[typing.Optional[Matrix]], typing.List[int]]:
+    """
+    Solve many levels together: the grids of all of them are propagated at once with arrays,
+    and the ones left ambiguous are split on the cell with the fewest possible characters,
+    with every guess propagated alongside the other grids on the next round.
+    Levels needing more than `max_branches` guesses are given up on, to be solved on their own,
+    and so are the last levels searched once they are too few to be worth propagating together.
+
+    :param levels: the levels to solve.
+    :type levels: typing.Sequence[Level]
+    :param batch_size: most grids propagated together, defaults to `BATCH_SIZE`.
+    :type batch_size: int, optional
+    :param max_branches: most guesses made on a single level, defaults to `MAX_BRANCHES`.
+    :type max_branches: int, optional
+    :param min_searching_share: share of the levels still searched below which the rest are
+        given up on, defaults to `MIN_SEARCHING_SHARE`.
+    :type min_searching_share: float, optional
+    :return: tuple of the solution of each level, in order (None for levels without one,
+        or that were given up on), and the indexes of the levels that were given up on.
+    :rtype: typing.Tuple[typing.List[typing.Optional[Matrix]], typing.List[int]]
+    """
+    solutions: typing.List[typing.Optional[Matrix]] = [None] * len(levels)
+    branches = [-1] * len(levels)  # The first grid of each level isn't a guess.
+    given_up = []
+    level_arrays = [_LevelArrays.from_level(level) for level in levels]
+    # The cells left to guess on each level, with the grid they were split on and the characters
+    # not tried yet, searched depth first like `Solver` does,
+    # with the next guess of every level propagated together.
+    pending = {}
+    for i, arrays in enumerate(level_arrays):
+        if arrays.cells:
+            pending[i] = [(arrays.initial_domains(), None, 0)]
+        else:
+            solutions[i] = _read_solution(levels[i], arrays.initial_domains())
+    batches: typing.Dict[typing.Tuple[int, ...], _Batch] = {}
+    while pending:
+        grids = [(i, _next_guess(guesses)) for i, guesses in pending.items()]
+        for i, _ in grids:
+            branches[i] += 1
+        used_batches = {}
+        for start in range(0, len(grids), batch_size):
+            indexes = tuple(i for i, _ in grids[start : start + batch_size])
+            # The same levels are usually propagated together round after round.
+            batch = batches.get(indexes) or _Batch([level_arrays[i] for i in indexes])
+            used_batches[indexes] = batch
+            domains = batch.propagate([guess for _, guess in grids[start : start + batch_size]])
+            counts = _count_bits(domains)
+            offsets = batch.cell_offsets
+            empty = numpy.minimum.reduceat(counts, offsets[:-1]) == 0
+            settled = numpy.maximum.reduceat(counts, offsets[:-1]) == 1
+            # The first cell with the fewest possible characters (but more than one) of each grid.
+            keys = numpy.where(counts > 1, counts, len(INPUT_ALPHABET) + 1) * len(counts)
+            split_cells = numpy.minimum.reduceat(keys + numpy.arange(len(counts)), offsets[:-1])
+            split_cells = split_cells % len(counts) - offsets[:-1]
+            for k, i in enumerate(indexes):
+                grid = domains[offsets[k] : offsets[k + 1]]
+                grid_counts = counts[offsets[k] : offsets[k + 1]]
+                if empty[k] or not _check_lines(level_arrays[i], grid, grid_counts):
+                    continue  # This guess (or the level itself) has no solution.
+                if settled[k]:
+                    solutions[i] = _read_solution(levels[i], grid)
+                    if solutions[i] is not None:
+                        del pending[i]
+                    continue
+                if branches[i] >= max_branches:
+                    given_up.append(i)
+                    del pending[i]
+                    continue
+                cell = int(split_cells[k])
+                pending[i].append((grid, cell, _from_words(grid[cell].tolist())))
+        batches = used_batches
+        pending = {i: guesses for i, guesses in pending.items() if guesses}
+        if len(pending) < len(levels) * min_searching_share:
+            # Propagating a handful of grids at a time costs more than it saves.
+            given_up.extend(pending)
+            pending = {}
+    return solutions, sorted(given_up)
+
+
+def solve_chunk(levels: typing.Sequence[Level]) -> typing.List[typing.Optional[Matrix]]:
+    """
+    Solve a chunk of levels together, then solve the ones that were given up on one at a time.
+
+    :param levels: the levels to solve.
+    :type levels: typing.Sequence[Level]
+    :return: the solution of each level, in order (None for levels without a solution).
+    :rtype: typing.List[typing.Optional[Matrix]]
+    """
+    solutions, given_up = solve_batch(levels)
+    for i in given_up:
+        solutions[i] = Solver(levels[i]).solve()
+    return solutions
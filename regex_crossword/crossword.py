@@ -1,3 +1,4 @@
+import copy
 import curses
 import curses.ascii
 import string
@@ -5,6 +6,7 @@ from pathlib import Path
 
 from .game import Game
 from .level_pack import LevelPack
+from .pack_watcher import PackWatcher
 from .utils import Coordinate, popup_message
 
 INTRO = '''Welcome to the Regex Crossword!
@@ -25,6 +27,7 @@ Your goal? Fill the entire grid so that every regex will match its coresponding
 
 KEYS:
 Navigate the grid using the {ARROW KEYS}. When you think you're done, press {ENTER} to validate yourself!
+To fill a whole row (or column) at once, press {TAB} (or {SHIFT+TAB}), type it and press {ENTER}. Pasting fills the row too.
 If your input was valid, you will move on to the next level in the level pack.
 Also, you can navigate back and forth between levels in your chosen level pack by pressing {PAGE_DOWN} and {PAGE_UP} respectfully.
 You can go back from any screen (including this help or the main selection) by pressing {ESCAPE}.
@@ -41,19 +44,54 @@ class Crossword:
     Class unifying all the logic needed to fully play the game, from loading the levels to playing them.
     """
 
-    def __init__(self, level_packs_path: Path):
-        self.pack_id_pairs = {
-            pack_id: Path(pack_path)
-            for pack_id, pack_path in zip(
-                string.digits + string.ascii_letters, sorted(level_packs_path.iterdir())
-            )
-        }  # Dict mapping between an arbitrary id (to allow easy selection for the user) an the actual pack path.
-        self.selection_screen_str = INTRO + '\n'.join(
-            f'{{{i}}} {path.stem}' for i, path in self.pack_id_pairs.items()
-        )  # The entire selection screen as a concatenated string.
+    def __init__(
+        self,
+        level_packs_path: Path,
+        *,
+        sort_by_difficulty: bool = False,
+        sessions_path: Path = None,
+    ):
+        self.pack_watcher = PackWatcher(
+            level_packs_path
+        )  # Keeps the level packs loaded, picking up packs that were added or changed while playing.
+        self.pack_id_pairs = {}
+        self.selection_screen_str = ''
+        self._update_packs()
+        self.sort_by_difficulty = sort_by_difficulty  # Whether to play each pack's levels from easiest to hardest.
+        self.sessions_path = sessions_path  # Where to save the progress of each level, if anywhere.
         self.help_str = HELP_TEXT  # The entire help text as a concatenated string.
         self.stdscr = None
 
+    def _update_packs(self) -> None:
+        """
+        Rebuild the pack ids and the selection screen from the currently loaded packs.
+
+        :return: none.
+        :rtype: None
+        """
+        self.pack_id_pairs = dict(
+            zip(string.digits + string.ascii_letters, self.pack_watcher)
+        )  # Dict mapping between an arbitrary id (to allow easy selection for the user) an the actual pack.
+        self.selection_screen_str = INTRO + '\n'.join(
+            f'{{{i}}} {pack.title}{self._format_difficulty(pack)}'
+            for i, pack in self.pack_id_pairs.items()
+        )  # The entire selection screen as a concatenated string.
+
+    @staticmethod
+    def _format_difficulty(pack: LevelPack) -> str:
+        """
+        Format the average difficulty of a pack for the selection screen, if it was precomputed.
+
+        :param pack: the level pack.
+        :type pack: LevelPack
+        :return: the formatted difficulty, or an empty string if it isn't available.
+        :rtype: str
+        """
+        scores = pack.difficulty_scores
+        if not scores:
+            return ''
+        return f' (difficulty {sum(scores) / len(scores):.1f})'
+
     def _display_help(self) -> None:
         """
         Pop up the help message to the screen.
@@ -79,12 +117,21 @@ class Crossword:
         :rtype: None
         """
         if chr(char) in self.pack_id_pairs:
-            pack = LevelPack(self.pack_id_pairs[chr(char)])
+            pack = copy.copy(
+                self.pack_id_pairs[chr(char)]
+            )  # The loaded pack is shared with the watcher, so it mustn't be reordered in place.
+            if self.sort_by_difficulty:
+                pack.sort_by_difficulty()
             i = 0
             while 0 <= i < len(pack):
                 self.stdscr.clear()
                 self.stdscr.refresh()
-                g = Game(pack[i])
+                journal_path = (
+                    Path(self.sessions_path, pack.title, pack[i].data_hash)
+                    if self.sessions_path is not None
+                    else None
+                )
+                g = Game(pack[i], journal_path=journal_path)
                 ret_val = g.play_level()
                 if ret_val == 0:
                     break
@@ -105,10 +152,24 @@ class Crossword:
             self.stdscr.addstr(self.selection_screen_str)
             self.stdscr.refresh()
             curses.curs_set(0)
+            self.stdscr.timeout(
+                int(self.pack_watcher.poll_interval * 1000)
+            )  # Wake up periodically to pick up changed packs even when no key is pressed.
             char = self.stdscr.getch()
             while char != curses.ascii.ESC:
+                if char == curses.ERR:
+                    # No key was pressed for a while, look for packs that were added or changed.
+                    if self.pack_watcher.poll():
+                        self._update_packs()
+                        self.stdscr.clear()
+                        self.stdscr.addstr(self.selection_screen_str)
+                        self.stdscr.refresh()
+                    char = self.stdscr.getch()
+                    continue
                 curses.curs_set(1)
                 self._handle_input(char)
+                if self.pack_watcher.poll():
+                    self._update_packs()
                 self.stdscr.clear()
                 self.stdscr.addstr(self.selection_screen_str)
                 self.stdscr.refresh()
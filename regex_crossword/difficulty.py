@@ -0,0 +1,126 @@
+import concurrent.futures
+import dataclasses
+import json
+import math
+import typing
+from pathlib import Path
+
+from .level import Level
+from .level_pack import DIFFICULTY_SUFFIX, LevelPack, find_level_pack_paths
+from .regex_ast import count_backreferences
+from .solver import Solver, level_regexes
+
+MAX_BRANCHES = 100000  # Levels needing more guesses than this are scored as if they needed exactly this many.
+
+
+@dataclasses.dataclass
+class LevelDifficulty:
+    """
+    Dataclass for storing the difficulty score of a level and the measurements it was computed from.
+    """
+
+    score: float
+    solved: bool
+    propagation_rounds: int
+    branches: int
+    backreferences: int
+    cells: int
+
+
+def compute_difficulty(level: Level) -> LevelDifficulty:
+    """
+    Compute the difficulty of a level by measuring the effort it takes to solve it.
+    The score grows with the grid size, the (logarithmic) number of propagation rounds and guesses
+    the solver needed, and the number of backreferences, which are hard to reason about by hand.
+
+    :param level: the level to measure.
+    :type level: Level
+    :return: the difficulty of the level.
+    :rtype: LevelDifficulty
+    """
+    solver = Solver(level, max_branches=MAX_BRANCHES)
+    solved = solver.solve() is not None
+    cells = len(level.topology.cells)
+    backreferences = sum(count_backreferences(regex.pattern) for regex in level_regexes(level))
+    score = (
+        math.sqrt(cells)
+        + math.log2(1 + solver.stats.propagation_rounds)
+        + 2 * math.log2(1 + solver.stats.branches)
+        + backreferences
+    )
+    return LevelDifficulty(
+        score=round(score, 2),
+        solved=solved,
+        propagation_rounds=solver.stats.propagation_rounds,
+        branches=solver.stats.branches,
+        backreferences=backreferences,
+        cells=cells,
+    )
+
+
+def _compute_difficulty_data(level: Level) -> typing.Dict:
+    """
+    Compute the difficulty of a level as a JSON compatible dict.
+    Runs in a worker process, so it must be a picklable module level function.
+
+    :param level: the level to measure.
+    :type level: Level
+    :return: the fields of the level's `LevelDifficulty`.
+    :rtype: typing.Dict
+    """
+    return dataclasses.asdict(compute_difficulty(level))
+
+
+def update_difficulty(
+    level_packs_path: Path, *, workers: typing.Optional[int] = None
+) -> typing.List[Path]:
+    """
+    Compute the difficulty scores of all the level packs in the given directory and store each pack's
+    scores next to it.
+    Packs that didn't change since their scores were stored are skipped, and levels that were already
+    scored (even in an older version of the pack) are not computed again.
+
+    :param level_packs_path: path to a directory containing level packs.
+    :type level_packs_path: Path
+    :param workers: number of worker processes, defaults to the number of CPUs.
+    :type workers: int, optional
+    :return: list of the pack paths whose scores were updated.
+    :rtype: typing.List[Path]
+    """
+    outdated = []  # Tuples of (pack path, pack, level hashes, known difficulties).
+    missing = {}  # Dict mapping between the hash of a level's data and the level to compute.
+    for pack_path in find_level_pack_paths(level_packs_path):
+        pack = LevelPack(pack_path)
+        if pack.difficulty_scores is not None:
+            continue
+        difficulty_path = pack_path.with_suffix(DIFFICULTY_SUFFIX)
+        known = (
+            json.loads(difficulty_path.read_text()).get('levels', {})
+            if difficulty_path.exists()
+            else {}
+        )
+        level_hashes = [level.data_hash for level in pack]
+        for level_hash, level in zip(level_hashes, pack):
+            if level_hash not in known:
+                missing[level_hash] = level
+        outdated.append((pack_path, pack, level_hashes, known))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        computed = dict(
+            zip(missing, executor.map(_compute_difficulty_data, missing.values()))
+        )
+
+    for pack_path, pack, level_hashes, known in outdated:
+        levels = {
+            level_hash: known.get(level_hash) or computed[level_hash]
+            for level_hash in level_hashes
+        }
+        difficulty_data = {
+            'pack_hash': pack.hash,
+            'scores': [levels[level_hash]['score'] for level_hash in level_hashes],
+            'levels': levels,
+        }
+        pack_path.with_suffix(DIFFICULTY_SUFFIX).write_text(
+            json.dumps(difficulty_data, indent=4)
+        )
+    return [pack_path for pack_path, *_ in outdated]
@@ -3,27 +3,94 @@ import curses.ascii
 import math
 import time
 import typing
+from pathlib import Path
 
+from .journal import FLUSH_EVERY_SECONDS, SessionJournal
 from .level import Level
 from .utils import Coordinate, popup_message
 
+MOVE_KEYS = {
+    curses.KEY_UP: 'up',
+    curses.KEY_DOWN: 'down',
+    curses.KEY_LEFT: 'left',
+    curses.KEY_RIGHT: 'right',
+}  # Mapping between the arrow keys and the direction they move the cursor in.
+LINE_ENTRY_KEYS = {
+    curses.ascii.TAB: 'right',
+    curses.KEY_BTAB: 'down',
+}  # Mapping between the keys that prompt for a whole line and the direction the line is entered in.
+BACKSPACE_KEYS = (curses.KEY_BACKSPACE, curses.ascii.BS, curses.ascii.DEL)
+PASTE_START = (curses.ascii.ESC, *b'[200~')  # Sent by the terminal before pasted text.
+PASTE_END = (curses.ascii.ESC, *b'[201~')  # Sent by the terminal after pasted text.
+BRACKETED_PASTE_ON = b'\x1b[?2004h'  # Asks the terminal to surround pasted text with the above.
+BRACKETED_PASTE_OFF = b'\x1b[?2004l'
+READ_TIMEOUT_MILLISECONDS = int(
+    FLUSH_EVERY_SECONDS * 1000
+)  # How long to wait for a key before making sure the journal is written to the disk.
+
+
+def _find_sequence(
+    keys: typing.List[int], sequence: typing.Tuple[int, ...], start: int = 0
+) -> int:
+    """
+    Return the index of the first occurrence of a sequence in a list of keys, or -1 if it isn't there.
+    """
+    for i in range(start, len(keys) - len(sequence) + 1):
+        if tuple(keys[i : i + len(sequence)]) == sequence:
+            return i
+    return -1
+
+
+def split_pastes(keys: typing.List[int]) -> typing.List[typing.Union[int, str]]:
+    """
+    Split keys read from the terminal into single keys and pasted strings,
+    recognizing pastes by the markers a terminal in bracketed paste mode surrounds them with.
+    Only the printable characters of a paste are kept.
+
+    :param keys: the keys read from the terminal.
+    :type keys: typing.List[int]
+    :return: list of single keys (int) and pasted strings (str).
+    :rtype: typing.List[typing.Union[int, str]]
+    """
+    events: typing.List[typing.Union[int, str]] = []
+    i = 0
+    while i < len(keys):
+        start = _find_sequence(keys, PASTE_START, i)
+        if start == -1:
+            events.extend(keys[i:])
+            break
+        events.extend(keys[i:start])
+        end = _find_sequence(keys, PASTE_END, start + len(PASTE_START))
+        pasted = keys[start + len(PASTE_START) : end if end != -1 else len(keys)]
+        events.append(
+            ''.join(chr(key) for key in pasted if 0 <= key < 256 and curses.ascii.isprint(key))
+        )
+        i = end + len(PASTE_END) if end != -1 else len(keys)
+    return events
+
 
 class Game:
     """
     Class initialized with a level and handles all the functionality of actually playing it.
     """
 
-    def __init__(self, level: Level):
+    def __init__(self, level: Level, *, journal_path: Path = None):
         self.level = level
         self.matrix = (
             level.create_matrix()
         )  # Create the matrix from the level so it'll be compatible.
-        self.matrix_cursor_pos = Coordinate(0, 0)  # Store the current position on the matrix.
+        self.journal = (
+            SessionJournal(journal_path, self.matrix) if journal_path is not None else None
+        )  # Persists the player's progress, if a path for it was given.
+        self.matrix_cursor_pos = Coordinate(
+            *level.topology.cells[0]
+        )  # Store the current position on the matrix.
         self.window_legend = None
         self.window_legend_alt = None
         self.window_game = None
         self.window_title_bar = None
         self.start_time = None
+        self._matrix_changed = False  # Whether the matrix changed since it was last drawn.
 
     def _create_legend_window(self, legend_str: str, *, position: Coordinate = None):
         """
@@ -100,14 +167,26 @@ class Game:
                 offset_y, legend_position_x + self.window_legend.getmaxyx()[1]
             ),
         )
+        matrix_str_split = self.level.topology.render(self.matrix).splitlines()
         self.window_game = curses.newwin(
-            self.matrix.str_height, self.matrix.str_width + 1, offset_y, 0
+            len(matrix_str_split), len(max(matrix_str_split, key=len)) + 1, offset_y, 0
         )
         self.window_game.keypad(True)
+        self.window_game.timeout(READ_TIMEOUT_MILLISECONDS)
         self._redraw_game()
-        self.window_game.move(
-            2 + (2 * self.matrix_cursor_pos.row), 4 + (4 * self.matrix_cursor_pos.col)
-        )
+        self._move_cursor()
+
+    def _move_cursor(self) -> None:
+        """
+        Move the window's cursor to where the current cell of the matrix is drawn.
+
+        :return: none.
+        :rtype: None
+        """
+        cursor_position = self.level.topology.positions[
+            self.matrix_cursor_pos.row, self.matrix_cursor_pos.col
+        ]
+        self.window_game.move(cursor_position.row, cursor_position.col)
 
     def _redraw_game(self) -> None:
         """
@@ -118,9 +197,121 @@ class Game:
         """
         cur_pos_y, cur_pos_x = self.window_game.getyx()
         self.window_game.move(0, 0)
-        self.window_game.addstr(str(self.matrix))
+        self.window_game.addstr(self.level.topology.render(self.matrix))
         self.window_game.refresh()
         self.window_game.move(cur_pos_y, cur_pos_x)
+        self._matrix_changed = False
+
+    def _set_cell(self, row: int, col: int, char: str) -> None:
+        """
+        Store a character in the given cell of the matrix (it's drawn on the next redraw).
+
+        :param row: the row of the cell.
+        :type row: int
+        :param col: the column of the cell.
+        :type col: int
+        :param char: the character to store.
+        :type char: str
+        :return: none.
+        :rtype: None
+        """
+        self.matrix[row][col] = char.upper()
+        if self.journal is not None:
+            self.journal.record(row, col, char.upper())
+        self._matrix_changed = True
+
+    def _enter_line(self, text: str, direction: str) -> None:
+        """
+        Store a whole string in the matrix, starting from the cursor and moving in the given direction.
+        The cursor is left on the last cell written, and characters that don't fit are dropped.
+
+        :param text: the string to store.
+        :type text: str
+        :param direction: the direction to write the string in.
+        :type direction: str
+        :return: none.
+        :rtype: None
+        """
+        cell = (self.matrix_cursor_pos.row, self.matrix_cursor_pos.col)
+        for i, char in enumerate(text):
+            if i > 0:
+                try:
+                    cell = self.level.topology.move(cell, direction)
+                except IndexError:
+                    break
+            self._set_cell(*cell, char)
+        self.matrix_cursor_pos = Coordinate(*cell)
+        self._move_cursor()
+
+    def _prompt_line(self, direction: str) -> str:
+        """
+        Prompt the player for a whole line on the bottom of the screen.
+
+        :param direction: the direction the line will be entered in.
+        :type direction: str
+        :return: the entered string, or an empty string if the prompt was escaped.
+        :rtype: str
+        """
+        prompt = f'Enter {"row" if direction == "right" else "column"} (ESC to cancel): '
+        window_prompt = curses.newwin(1, curses.COLS - 1, curses.LINES - 1, 0)
+        window_prompt.keypad(True)
+        window_prompt.timeout(READ_TIMEOUT_MILLISECONDS)
+        text = ''
+        accepted = None
+        while accepted is None:
+            window_prompt.clear()
+            window_prompt.addstr((prompt + text)[: curses.COLS - 2])
+            window_prompt.refresh()
+            # Pastes are read as a whole, so the escape sequences around them don't cancel the prompt.
+            for char in split_pastes(self._read_keys(window_prompt)):
+                if isinstance(char, str):
+                    text += char
+                elif char in (curses.KEY_ENTER, curses.ascii.NL, curses.ascii.ESC):
+                    accepted = char != curses.ascii.ESC
+                    break
+                elif char in BACKSPACE_KEYS:
+                    text = text[:-1]
+                elif curses.ascii.isprint(char):
+                    text += chr(char)
+        window_prompt.clear()
+        window_prompt.refresh()
+        return text if accepted else ''
+
+    def _read_keys(self, window=None) -> typing.List[int]:
+        """
+        Wait for a key, then drain every key already queued after it (e.g. when typing over a slow
+        connection) so they can all be handled before the matrix is redrawn once.
+        A paste that didn't fully arrive yet is read until its end.
+        If no key is pressed for a while, the journal is written to the disk instead,
+        so pending edits aren't lost if the session is killed while idle.
+
+        :param window: the window to read from, defaults to the game window.
+        :type window: curses.window, optional
+        :return: list of the read keys (empty if none was pressed).
+        :rtype: typing.List[int]
+        """
+        window = window if window is not None else self.window_game
+        char = window.getch()
+        if char == curses.ERR:
+            if self.journal is not None:
+                self.journal.flush()
+            return []
+        keys = [char]
+        window.timeout(0)
+        try:
+            char = window.getch()
+            while char != curses.ERR:
+                keys.append(char)
+                char = window.getch()
+        finally:
+            window.timeout(READ_TIMEOUT_MILLISECONDS)
+        paste_start = _find_sequence(keys, PASTE_START)
+        while paste_start != -1 and _find_sequence(keys, PASTE_END, paste_start) == -1:
+            char = window.getch()
+            if char == curses.ERR:
+                break  # The paste never ended, settle for what arrived.
+            keys.append(char)
+        return keys
 
     def _handle_input(self, char: int) -> bool:
         """
@@ -128,46 +319,35 @@ class Game:
         - If it's an arrow key, move the cursor position accordingly.
         - If it's ENTER, try to validate the matrix against the level.
         - If it's a screen resize, redraw all the windows in their new position.
+        - If it's TAB (or SHIFT+TAB), prompt for a whole row (or column) to store in the matrix.
         - If it's any printable character, store them in the matrix.
+        The matrix isn't redrawn here, so a burst of keys can be handled before redrawing it once.
 
         :param char: the character (int value) to handle.
         :type char: int
         :return: True if the game is finished (matrix validated successfully), False otherwise.
         :rtype: bool
         """
-        cur_pos_y, cur_pos_x = self.window_game.getyx()
         try:
-            if char == curses.KEY_RIGHT:
-                if self.matrix_cursor_pos.col + 1 >= self.matrix.columns:
-                    raise IndexError('Cursor got off the matrix')
-                self.window_game.move(cur_pos_y, cur_pos_x + 4)
-                self.matrix_cursor_pos.col += 1
-            elif char == curses.KEY_LEFT:
-                if self.matrix_cursor_pos.col - 1 < 0:
-                    raise IndexError('Cursor got off the matrix')
-                self.window_game.move(cur_pos_y, cur_pos_x - 4)
-                self.matrix_cursor_pos.col -= 1
-            elif char == curses.KEY_DOWN:
-                if self.matrix_cursor_pos.row + 1 >= self.matrix.rows:
-                    raise IndexError('Cursor got off the matrix')
-                self.window_game.move(cur_pos_y + 2, cur_pos_x)
-                self.matrix_cursor_pos.row += 1
-            elif char == curses.KEY_UP:
-                if self.matrix_cursor_pos.row - 1 < 0:
-                    raise IndexError('Cursor got off the matrix')
-                self.window_game.move(cur_pos_y - 2, cur_pos_x)
-                self.matrix_cursor_pos.row -= 1
+            if char in MOVE_KEYS:
+                row, col = self.level.topology.move(
+                    (self.matrix_cursor_pos.row, self.matrix_cursor_pos.col), MOVE_KEYS[char]
+                )
+                self.matrix_cursor_pos = Coordinate(row, col)
+                self._move_cursor()
             elif char in (curses.KEY_ENTER, curses.ascii.NL):
                 if self.level.check_matrix(self.matrix):
                     return True
             elif char == curses.KEY_RESIZE:
                 curses.update_lines_cols()
                 self._init_windows()
+            elif char in LINE_ENTRY_KEYS:
+                text = self._prompt_line(LINE_ENTRY_KEYS[char])
+                self._enter_line(text, LINE_ENTRY_KEYS[char])
             elif curses.ascii.isprint(char):
-                self.matrix[self.matrix_cursor_pos.row][self.matrix_cursor_pos.col] = chr(
-                    char
-                ).upper()
-                self._redraw_game()
+                self._set_cell(
+                    self.matrix_cursor_pos.row, self.matrix_cursor_pos.col, chr(char)
+                )
         except Exception:
             pass
         return False
@@ -188,22 +368,49 @@ class Game:
 
     def play_level(self) -> int:
         """
-        Initialize the game and play the level.
+        Initialize the game and play the level, resuming any progress saved in the journal.
         Return 0 if the game should be terminated, 1 to go to the next stage and -1 to go to the previous one.
 
+        :return: signal wether to quit or go to the next or previous level.
+        :rtype: int
+        """
+        if self.journal is not None:
+            self.journal.restore()
+        curses.putp(BRACKETED_PASTE_ON)
+        try:
+            return self._play_level()
+        finally:
+            curses.putp(BRACKETED_PASTE_OFF)
+            if self.journal is not None:
+                self.journal.close()
+
+    def _play_level(self) -> int:
+        """
+        Play the level until it's finished or the player navigates away from it.
+
         :return: signal wether to quit or go to the next or previous level.
         :rtype: int
         """
         self._init_windows()
         self.start_time = time.time()
-        char = self.window_game.getch()
-        while char != curses.ascii.ESC:
-            if char == curses.KEY_NPAGE:
-                return -1
-            if char == curses.KEY_PPAGE:
-                return 1
-            if self._handle_input(char):
-                self._finished_level()
-                return 1
-            char = self.window_game.getch()
-        return 0
+        while True:
+            for char in split_pastes(self._read_keys()):
+                if isinstance(char, str):
+                    # Pasted text fills the row from the cursor.
+                    self._enter_line(char, 'right')
+                    continue
+                if char == curses.ascii.ESC:
+                    return 0
+                if char == curses.KEY_NPAGE:
+                    return -1
+                if char == curses.KEY_PPAGE:
+                    return 1
+                if self._handle_input(char):
+                    if self._matrix_changed:
+                        self._redraw_game()
+                    if self.journal is not None:
+                        self.journal.clear()
+                    self._finished_level()
+                    return 1
+            if self._matrix_changed:
+                self._redraw_game()
@@ -0,0 +1,499 @@
+import contextlib
+import curses
+import curses.ascii
+import dataclasses
+import json
+import statistics
+import time
+import typing
+from pathlib import Path
+
+from .crossword import Crossword
+from .game import PASTE_END, PASTE_START, Game
+from .level import Level
+
+DEFAULT_LINES = 50  # Height of the fake terminal, unless a trace resizes it.
+DEFAULT_COLS = 200  # Width of the fake terminal, unless a trace resizes it.
+
+KEY_NAMES = {
+    'ESC': curses.ascii.ESC,
+    'ENTER': curses.ascii.NL,
+    'TAB': curses.ascii.TAB,
+    **{name: getattr(curses, name) for name in dir(curses) if name.startswith('KEY_')},
+}  # Names that can be used in traces for keys that aren't printable characters.
+
+_MISSING = object()  # Marks attributes that didn't exist before they were swapped.
+
+TraceEvent = typing.Union[str, int, typing.Dict[str, typing.Any]]
+
+
+@contextlib.contextmanager
+def swap_attributes(target: typing.Any, **attributes) -> typing.Iterator[None]:
+    """
+    Set attributes of an object (e.g. the curses module) for the duration of the context,
+    restoring their previous values (or removing them, if they didn't exist) afterwards.
+
+    :param target: the object whose attributes are swapped.
+    :type target: typing.Any
+    :return: context of the swap.
+    """
+    saved = {name: getattr(target, name, _MISSING) for name in attributes}
+    for name, value in attributes.items():
+        setattr(target, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is _MISSING:
+                delattr(target, name)
+            else:
+                setattr(target, name, value)
+
+
+class TraceExhausted(Exception):
+    """
+    Raised by the fake screen once all the events of a trace were consumed.
+    """
+
+
+def parse_event(
+    event: TraceEvent,
+) -> typing.Tuple[typing.List[int], typing.Optional[typing.Tuple[int, int]]]:
+    """
+    Parse a single trace event into its keys and an optional new terminal size.
+    An event is either a single printable character, the name of a key (`ESC`, `ENTER`, `KEY_NPAGE`...),
+    a raw key code, a dict of the form `{"resize": [lines, cols]}` for a terminal resize,
+    a dict of the form `{"paste": "text"}` for pasted text, or a dict of the form `{"burst": "text"}`
+    for keys typed one by one that arrive all at once (e.g. over a slow connection).
+
+    :param event: the event to parse.
+    :type event: TraceEvent
+    :return: tuple of the key codes and the new terminal size (None if it isn't a resize).
+    :rtype: typing.Tuple[typing.List[int], typing.Optional[typing.Tuple[int, int]]]
+    """
+    if isinstance(event, dict):
+        if 'paste' in event:
+            # Like a terminal in bracketed paste mode, surround the pasted text with markers.
+            return [*PASTE_START, *(ord(char) for char in event['paste']), *PASTE_END], None
+        if 'burst' in event:
+            return [ord(char) for char in event['burst']], None
+        lines, cols = event['resize']
+        return [curses.KEY_RESIZE], (lines, cols)
+    if isinstance(event, int):
+        return [event], None
+    if len(event) == 1:
+        return [ord(event)], None
+    return [KEY_NAMES[event]], None
+
+
+def format_key(key: int) -> TraceEvent:
+    """
+    Format a key code as a trace event (the opposite of `parse_event`).
+    A resize is formatted with the current `curses.LINES` and `curses.COLS`,
+    so they must be updated to the new size first.
+
+    :param key: the key code to format.
+    :type key: int
+    :return: the trace event.
+    :rtype: TraceEvent
+    """
+    if key == curses.KEY_RESIZE:
+        return {'resize': [curses.LINES, curses.COLS]}
+    if 0 <= key < 256 and curses.ascii.isprint(key):
+        return chr(key)
+    for name, code in KEY_NAMES.items():
+        if code == key:
+            return name
+    return key
+
+
+def load_trace(path: Path) -> typing.List[TraceEvent]:
+    """
+    Load a recorded trace from a JSON file.
+
+    :param path: path to the trace file.
+    :type path: Path
+    :return: list of trace events.
+    :rtype: typing.List[TraceEvent]
+    """
+    return json.loads(path.read_text())
+
+
+@dataclasses.dataclass
+class ReplayReport:
+    """
+    Dataclass for storing the measurements of a replayed trace.
+    """
+
+    latencies: typing.List[float]  # Seconds it took to handle each event.
+    frames: int  # Number of times a window (or the whole screen) was refreshed.
+    output_chars: int  # Number of characters written to all the windows.
+
+    @property
+    def events(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def mean_latency(self) -> float:
+        return statistics.mean(self.latencies) if self.latencies else 0.0
+
+    @property
+    def max_latency(self) -> float:
+        return max(self.latencies, default=0.0)
+
+    def __str__(self) -> str:
+        return (
+            f'{self.events} events, mean latency {self.mean_latency * 1000:.3f}ms, '
+            f'max latency {self.max_latency * 1000:.3f}ms, {self.frames} frames, '
+            f'{self.output_chars} characters written'
+        )
+
+
+class FakeWindow:
+    """
+    Class imitating a curses window, drawing nothing and reading its input from a headless screen.
+    """
+
+    def __init__(self, screen: 'HeadlessScreen', lines: int, cols: int):
+        self._screen = screen
+        self._size = (lines, cols)
+        self._cursor = (0, 0)
+        self._nodelay = False
+
+    def addstr(self, text: str, *args) -> None:
+        self._screen.output_chars += len(text)
+        lines = text.split('\n')
+        row, col = self._cursor
+        if len(lines) > 1:
+            self._cursor = (row + len(lines) - 1, len(lines[-1]))
+        else:
+            self._cursor = (row, col + len(text))
+
+    def move(self, row: int, col: int) -> None:
+        self._cursor = (row, col)
+
+    def getyx(self) -> typing.Tuple[int, int]:
+        return self._cursor
+
+    def getmaxyx(self) -> typing.Tuple[int, int]:
+        return self._size
+
+    def refresh(self) -> None:
+        self._screen.frames += 1
+
+    def noutrefresh(self) -> None:
+        pass
+
+    def clear(self) -> None:
+        self._cursor = (0, 0)
+
+    def getch(self) -> int:
+        if self._nodelay:
+            return self._screen.queued_key()
+        return self._screen.next_key()
+
+    def border(self, *args) -> None:
+        pass
+
+    def keypad(self, flag: bool) -> None:
+        pass
+
+    def nodelay(self, flag: bool) -> None:
+        self._nodelay = flag
+
+    def timeout(self, delay: int) -> None:
+        # Blocking reads never time out, the trace decides when the next key arrives.
+        self._nodelay = delay == 0
+
+
+class HeadlessScreen:
+    """
+    Class that replaces the curses terminal with fake windows fed by a trace of events,
+    measuring how long it takes to handle each event and how much is drawn.
+    """
+
+    def __init__(
+        self,
+        trace: typing.Iterable[TraceEvent],
+        *,
+        lines: int = DEFAULT_LINES,
+        cols: int = DEFAULT_COLS,
+    ):
+        self.lines = lines
+        self.cols = cols
+        self.frames = 0
+        self.output_chars = 0
+        self.latencies: typing.List[float] = []
+        self._events = iter(trace)
+        self._queued_keys: typing.List[int] = []  # Keys of the current event that weren't read yet.
+        self._last_event_time: typing.Optional[float] = None
+
+    def next_key(self) -> int:
+        """
+        Return the next key of the current event, or the first key of the next event,
+        timing how long the previous event took to handle.
+
+        :return: the key code.
+        :rtype: int
+        """
+        if self._queued_keys:
+            return self._queued_keys.pop(0)
+        self.finish()
+        try:
+            keys, size = parse_event(next(self._events))
+        except StopIteration:
+            raise TraceExhausted()
+        if size is not None:
+            self.lines, self.cols = size
+        self._last_event_time = time.perf_counter()
+        self._queued_keys = keys[1:]
+        return keys[0]
+
+    def queued_key(self) -> int:
+        """
+        Return the next key of the current event without waiting for the next event,
+        like a non-blocking read does.
+
+        :return: the key code, or `curses.ERR` if the current event has no keys left.
+        :rtype: int
+        """
+        if self._queued_keys:
+            return self._queued_keys.pop(0)
+        return curses.ERR
+
+    def finish(self) -> None:
+        """
+        Stop timing the event currently being handled (called once the game stops reading input).
+
+        :return: none.
+        :rtype: None
+        """
+        if self._last_event_time is not None:
+            self.latencies.append(time.perf_counter() - self._last_event_time)
+            self._last_event_time = None
+
+    def _newwin(self, *args) -> FakeWindow:
+        lines, cols = (args[0], args[1]) if len(args) >= 2 else (self.lines, self.cols)
+        return FakeWindow(self, lines, cols)
+
+    def _doupdate(self) -> None:
+        self.frames += 1
+
+    def _update_lines_cols(self) -> None:
+        curses.LINES = self.lines
+        curses.COLS = self.cols
+
+    def _wrapper(self, func: typing.Callable, *args, **kwargs):
+        return func(self._newwin(), *args, **kwargs)
+
+    @contextlib.contextmanager
+    def install(self) -> typing.Iterator['HeadlessScreen']:
+        """
+        Replace the curses functions used by the game with headless ones for the duration of the context.
+
+        :return: context yielding the screen itself.
+        """
+        with swap_attributes(
+            curses,
+            LINES=self.lines,
+            COLS=self.cols,
+            newwin=self._newwin,
+            doupdate=self._doupdate,
+            update_lines_cols=self._update_lines_cols,
+            curs_set=lambda visibility: 1,
+            putp=lambda string: None,
+            wrapper=self._wrapper,
+        ):
+            yield self
+
+    def report(self) -> ReplayReport:
+        """
+        Return the measurements gathered so far.
+
+        :return: the report of the replay.
+        :rtype: ReplayReport
+        """
+        return ReplayReport(list(self.latencies), self.frames, self.output_chars)
+
+
+def replay_level(
+    level: Level, trace: typing.Iterable[TraceEvent], **screen_kwargs
+) -> ReplayReport:
+    """
+    Play a level headlessly, feeding it the events of the given trace.
+
+    :param level: the level to play.
+    :type level: Level
+    :param trace: the events to feed the game.
+    :type trace: typing.Iterable[TraceEvent]
+    :return: the measurements of the replay.
+    :rtype: ReplayReport
+    """
+    screen = HeadlessScreen(trace, **screen_kwargs)
+    with screen.install():
+        try:
+            Game(level).play_level()
+        except TraceExhausted:
+            pass
+    screen.finish()
+    return screen.report()
+
+
+def replay_crossword(
+    crossword: Crossword, trace: typing.Iterable[TraceEvent], **screen_kwargs
+) -> ReplayReport:
+    """
+    Run the whole game headlessly (selection screen included), feeding it the events of the given trace.
+
+    :param crossword: the game to run.
+    :type crossword: Crossword
+    :param trace: the events to feed the game.
+    :type trace: typing.Iterable[TraceEvent]
+    :return: the measurements of the replay.
+    :rtype: ReplayReport
+    """
+    screen = HeadlessScreen(trace, **screen_kwargs)
+    with screen.install():
+        try:
+            crossword.mainloop()
+        except TraceExhausted:
+            pass
+    screen.finish()
+    return screen.report()
+
+
+class _RecordingWindow:
+    """
+    Class wrapping a real curses window, recording every key read from it.
+    """
+
+    def __init__(self, window, trace: typing.List[TraceEvent]):
+        self._window = window
+        self._trace = trace
+
+    def getch(self, *args) -> int:
+        key = self._window.getch(*args)
+        if key == curses.ERR:
+            return key
+        if key == curses.KEY_RESIZE:
+            curses.update_lines_cols()  # Record the new size, not the one before the resize.
+        self._trace.append(format_key(key))
+        paste_end = [format_key(marker_key) for marker_key in PASTE_END]
+        if self._trace[-len(paste_end) :] == paste_end:
+            self._collapse_paste()
+        return key
+
+    def _collapse_paste(self) -> None:
+        """
+        Replace the keys of the paste that just ended with a single paste event.
+        """
+        paste_start = [format_key(marker_key) for marker_key in PASTE_START]
+        paste_end_index = len(self._trace) - len(PASTE_END)
+        for i in range(paste_end_index - len(paste_start), -1, -1):
+            if self._trace[i : i + len(paste_start)] == paste_start:
+                pasted = self._trace[i + len(paste_start) : paste_end_index]
+                self._trace[i:] = [
+                    {
+                        'paste': ''.join(
+                            event for event in pasted if isinstance(event, str) and len(event) == 1
+                        )
+                    }
+                ]
+                return
+
+    def __getattr__(self, name: str):
+        return getattr(self._window, name)
+
+
+@contextlib.contextmanager
+def record_trace(path: Path) -> typing.Iterator[typing.List[TraceEvent]]:
+    """
+    Record every key read by the game for the duration of the context, and save them as a trace.
+
+    :param path: where to save the trace to.
+    :type path: Path
+    :return: context yielding the list of recorded events.
+    """
+    trace: typing.List[TraceEvent] = []
+    real_newwin = curses.newwin
+    real_wrapper = curses.wrapper
+
+    def _newwin(*args):
+        return _RecordingWindow(real_newwin(*args), trace)
+
+    def _wrapper(func, *args, **kwargs):
+        return real_wrapper(
+            lambda stdscr, *a, **kw: func(_RecordingWindow(stdscr, trace), *a, **kw),
+            *args,
+            **kwargs,
+        )
+
+    try:
+        with swap_attributes(curses, newwin=_newwin, wrapper=_wrapper):
+            yield trace
+    finally:
+        path.write_text(json.dumps(trace))
+
+
+def synthetic_level(rows: int, columns: int) -> Level:
+    """
+    Create a level of the given size, accepting any letters.
+
+    :param rows: number of rows in the level.
+    :type rows: int
+    :param columns: number of columns in the level.
+    :type columns: int
+    :return: the created level.
+    :rtype: Level
+    """
+    return Level(
+        {
+            'title': f'Synthetic {rows}x{columns}',
+            'up_to_down': ['[A-Z]*'] * columns,
+            'left_to_right': ['[A-Z]*'] * rows,
+        }
+    )
+
+
+def synthetic_trace(rows: int, columns: int) -> typing.List[TraceEvent]:
+    """
+    Create a trace filling every cell of a grid of the given size row by row,
+    resizing the terminal halfway through and validating the grid at the end.
+
+    :param rows: number of rows in the grid.
+    :type rows: int
+    :param columns: number of columns in the grid.
+    :type columns: int
+    :return: list of trace events.
+    :rtype: typing.List[TraceEvent]
+    """
+    trace: typing.List[TraceEvent] = []
+    for row in range(rows):
+        for col in range(columns):
+            trace.append(chr(ord('A') + (row + col) % 26))
+            if col < columns - 1:
+                trace.append('KEY_RIGHT')
+        if row == rows // 2:
+            trace.append({'resize': [DEFAULT_LINES + 10, DEFAULT_COLS + 20]})
+        if row < rows - 1:
+            trace.append('KEY_DOWN')
+            trace.extend(['KEY_LEFT'] * (columns - 1))
+    trace.extend(['ENTER', 'ENTER'])
+    return trace
+
+
+def benchmark(
+    sizes: typing.Iterable[int] = (5, 10, 20, 50)
+) -> typing.Dict[int, ReplayReport]:
+    """
+    Replay synthetic traces against square grids of the given sizes.
+
+    :param sizes: the sizes of the grids to benchmark, defaults to 5x5 through 50x50.
+    :type sizes: typing.Iterable[int]
+    :return: dict mapping between a grid size and the report of its replay.
+    :rtype: typing.Dict[int, ReplayReport]
+    """
+    return {
+        size: replay_level(synthetic_level(size, size), synthetic_trace(size, size))
+        for size in sizes
+    }
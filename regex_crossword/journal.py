@@ -0,0 +1,154 @@
+import json
+import os
+import time
+import typing
+from pathlib import Path
+
+from .matrix import Matrix
+
+JOURNAL_SUFFIX = '.journal'  # Suffix of the append-only file of cell edits.
+SNAPSHOT_SUFFIX = '.snapshot'  # Suffix of the file holding the compacted state of the matrix.
+FLUSH_EVERY_EDITS = 16  # Number of pending edits that triggers a write to the journal.
+FLUSH_EVERY_SECONDS = 1.0  # Time since the last write that triggers one on the next edit.
+COMPACT_EVERY_EDITS = 256  # Number of journaled edits that triggers a snapshot, bounding the replay time.
+
+
+def _remove_file(path: Path) -> None:
+    """
+    Remove a file, if it exists.
+    """
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class SessionJournal:
+    """
+    Class that persists the edits made to a matrix, so a session can be resumed after it was interrupted.
+    Edits are appended to a journal in batches, and the journal is periodically compacted into a snapshot
+    of the whole matrix, so resuming never replays more than `COMPACT_EVERY_EDITS` edits.
+    """
+
+    def __init__(self, path: Path, matrix: Matrix):
+        self.matrix = matrix
+        self._journal_path = path.with_suffix(JOURNAL_SUFFIX)
+        self._snapshot_path = path.with_suffix(SNAPSHOT_SUFFIX)
+        self._journal_file: typing.Optional[typing.TextIO] = None
+        self._journal_length = 0  # Number of edits currently written to the journal.
+        self._pending: typing.List[str] = []  # Edits that weren't written to the journal yet.
+        self._last_flush = time.monotonic()
+
+    def restore(self) -> bool:
+        """
+        Restore the matrix from the latest snapshot and replay the journal on top of it.
+
+        :return: True if any previous state was restored, False otherwise.
+        :rtype: bool
+        """
+        restored = False
+        if self._snapshot_path.exists():
+            rows = json.loads(self._snapshot_path.read_text())
+            if len(rows) == self.matrix.rows and all(
+                len(row) == self.matrix.columns for row in rows
+            ):
+                for i, row in enumerate(rows):
+                    self.matrix[i] = list(row)
+                restored = True
+        if self._journal_path.exists():
+            for entry in self._journal_path.read_text().splitlines():
+                try:
+                    row, col, char = (int(value) for value in entry.split())
+                    self.matrix[row][col] = chr(char)
+                except (ValueError, IndexError):
+                    continue  # A partially written entry from a crash, or one that doesn't fit the matrix.
+                self._journal_length += 1
+                restored = True
+        return restored
+
+    def record(self, row: int, col: int, char: str) -> None:
+        """
+        Record an edit of a single cell of the matrix.
+        The edit is only written once enough edits accumulated or enough time passed since the last write.
+
+        :param row: the row of the edited cell.
+        :type row: int
+        :param col: the column of the edited cell.
+        :type col: int
+        :param char: the new value of the cell.
+        :type char: str
+        :return: none.
+        :rtype: None
+        """
+        self._pending.append(f'{row} {col} {ord(char)}\n')
+        if (
+            len(self._pending) >= FLUSH_EVERY_EDITS
+            or time.monotonic() - self._last_flush >= FLUSH_EVERY_SECONDS
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write all the pending edits to the journal, compacting it into a snapshot if it grew too long.
+
+        :return: none.
+        :rtype: None
+        """
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        if self._journal_file is None:
+            self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal_file = self._journal_path.open('a')
+        self._journal_file.writelines(self._pending)
+        self._journal_file.flush()
+        self._journal_length += len(self._pending)
+        self._pending.clear()
+        if self._journal_length >= COMPACT_EVERY_EDITS:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Write a snapshot of the whole matrix and empty the journal.
+        The snapshot replaces the previous one atomically. If we crash before the journal is emptied,
+        replaying it over the new snapshot is harmless since it only holds edits the snapshot already has.
+
+        :return: none.
+        :rtype: None
+        """
+        self._snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._snapshot_path.with_suffix(SNAPSHOT_SUFFIX + '.tmp')
+        temp_path.write_text(json.dumps([list(self.matrix[i]) for i in range(self.matrix.rows)]))
+        os.replace(temp_path, self._snapshot_path)
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        _remove_file(self._journal_path)
+        self._journal_length = 0
+
+    def close(self) -> None:
+        """
+        Write all the pending edits and close the journal.
+
+        :return: none.
+        :rtype: None
+        """
+        self.flush()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def clear(self) -> None:
+        """
+        Discard the journal and snapshot altogether (e.g. once the level was finished).
+
+        :return: none.
+        :rtype: None
+        """
+        self._pending.clear()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        _remove_file(self._journal_path)
+        _remove_file(self._snapshot_path)
+        self._journal_length = 0
@@ -1,10 +1,53 @@
-import itertools
+import hashlib
+import json
 import re
 import typing
 
 from .matrix import Matrix
+from .topology import HexagonalTopology, SquareTopology, Topology
 
 LevelDataType = typing.Dict[str, typing.Union[str, typing.List[str]]]
+REGEX_FIELDS = (
+    'up_to_down',
+    'down_to_up',
+    'left_to_right',
+    'right_to_left',
+    'up_left_to_down_right',
+    'up_right_to_down_left',
+)  # The fields of a level's data that hold lists of regexes.
+
+
+def validate_level_data(level_data: typing.Any) -> None:
+    """
+    Check that a level's data is structured like a level.
+
+    :param level_data: the level's data, as loaded from its pack.
+    :type level_data: typing.Any
+    :raises ValueError: if the data isn't a dict, or one of its fields has the wrong type.
+    :return: none.
+    :rtype: None
+    """
+    if not isinstance(level_data, dict):
+        raise ValueError(f'Level must be an object, not {type(level_data).__name__}.')
+    for field in ('title', 'shape'):
+        if not isinstance(level_data.get(field, ''), str):
+            raise ValueError(f'Level field "{field}" must be a string.')
+    for field in REGEX_FIELDS:
+        regexes = level_data.get(field, [])
+        if not isinstance(regexes, list) or not all(isinstance(regex, str) for regex in regexes):
+            raise ValueError(f'Level field "{field}" must be a list of strings.')
+
+
+def serialize_level_data(level_data: typing.Any) -> str:
+    """
+    Serialize a level's data the same way regardless of the order of its fields.
+
+    :param level_data: the level's data, as loaded from its pack.
+    :type level_data: typing.Any
+    :return: the level's data as a JSON string with sorted keys.
+    :rtype: str
+    """
+    return json.dumps(level_data, sort_keys=True)
 
 
 class Level:
@@ -13,7 +56,11 @@ class Level:
     """
 
     def __init__(self, level_data: LevelDataType):
+        validate_level_data(level_data)
         self.title = level_data.get('title')
+        self.data_hash = hashlib.sha256(
+            serialize_level_data(level_data).encode()
+        ).hexdigest()  # Identifies the level's exact data, unlike its fingerprint.
         self.up_to_down_regexes = [
             re.compile(regex) for regex in level_data.get('up_to_down', [])
         ]
@@ -26,6 +73,34 @@ class Level:
         self.right_to_left_regexes = [
             re.compile(regex) for regex in level_data.get('right_to_left', [])
         ]
+        self.shape = level_data.get('shape', 'square')  # Either "square" or "hexagonal".
+        self.up_left_to_down_right_regexes = [
+            re.compile(regex) for regex in level_data.get('up_left_to_down_right', [])
+        ]  # Only used by hexagonal levels.
+        self.up_right_to_down_left_regexes = [
+            re.compile(regex) for regex in level_data.get('up_right_to_down_left', [])
+        ]  # Only used by hexagonal levels.
+        self.topology = self._create_topology()  # The level's geometry, computed only once.
+
+    def _create_topology(self) -> Topology:
+        """
+        Create the topology matching the level's shape.
+
+        :return: the level's topology.
+        :rtype: Topology
+        """
+        if self.shape == 'hexagonal':
+            return HexagonalTopology(
+                self.left_to_right_regexes,
+                self.up_left_to_down_right_regexes,
+                self.up_right_to_down_left_regexes,
+            )
+        return SquareTopology(
+            self.left_to_right_regexes,
+            self.right_to_left_regexes,
+            self.up_to_down_regexes,
+            self.down_to_up_regexes,
+        )
 
     def create_matrix(self) -> Matrix:
         """
@@ -34,10 +109,7 @@ class Level:
         :return: the created matrix
         :rtype: Matrix
         """
-        return Matrix(
-            len(max([self.left_to_right_regexes, self.right_to_left_regexes], key=len)),
-            len(max([self.up_to_down_regexes, self.down_to_up_regexes], key=len)),
-        )
+        return Matrix(self.topology.rows, self.topology.columns)
 
     def check_matrix(self, mat: Matrix) -> bool:
         """
@@ -45,54 +117,11 @@ class Level:
 
         :param mat: the matrix to validate.
         :type mat: Matrix
+        :raises ValueError: if the matrix isn't shaped like the level.
         :return: True if the matrix has been validated successfully, False otherwise.
         :rtype: bool
         """
-        matrix_expected_row_len = len(
-            max([self.left_to_right_regexes, self.right_to_left_regexes], key=len)
-        )
-        matrix_row_strings = [
-            ''.join(mat[i][j] for j in range(mat.columns)) for i in range(mat.rows)
-        ]
-        if matrix_expected_row_len != len(matrix_row_strings):
-            raise ValueError(
-                f'Matrix with {len(matrix_row_strings)} rows is incompatible with level of {matrix_expected_row_len} rows.'
-            )
-
-        matrix_expected_column_len = len(
-            max([self.up_to_down_regexes, self.down_to_up_regexes], key=len)
-        )
-        matrix_column_strings = [
-            ''.join(mat[j][i] for j in range(mat.rows)) for i in range(mat.columns)
-        ]
-        if matrix_expected_column_len != len(matrix_column_strings):
-            raise ValueError(
-                f'Matrix with {len(matrix_column_strings)} columns is incompatible with level of {matrix_expected_column_len} columns.'
-            )
-
-        for row, utd_regex, dtu_regex in itertools.zip_longest(
-            matrix_column_strings,
-            self.up_to_down_regexes,
-            self.down_to_up_regexes,
-            fillvalue=re.compile(''),
-        ):
-            if (utd_regex.pattern and re.fullmatch(utd_regex, row) is None) or (
-                dtu_regex.pattern and re.fullmatch(dtu_regex, row) is None
-            ):
-                return False
-
-        for row, ltr_regex, rtl_regex in itertools.zip_longest(
-            matrix_row_strings,
-            self.left_to_right_regexes,
-            self.right_to_left_regexes,
-            fillvalue=re.compile(''),
-        ):
-            if (ltr_regex.pattern and re.fullmatch(ltr_regex, row) is None) or (
-                rtl_regex.pattern and re.fullmatch(rtl_regex, row) is None
-            ):
-                return False
-
-        return True
+        return self.topology.check_matrix(mat)
 
     def format_up_to_down_regexes(self) -> str:
         """
@@ -146,6 +175,38 @@ class Level:
         )
         return ret_str.strip()
 
+    def format_up_left_to_down_right_regexes(self) -> str:
+        """
+        Format a string listing all the regexes that will validate the lines from top left to bottom right.
+
+        :return: the formatted string.
+        :rtype: str
+        """
+        ret_str = 'Up Left -> Down Right:\n'
+        ret_str += '\n'.join(
+            [
+                f'{i}: {regex.pattern}'
+                for i, regex in enumerate(self.up_left_to_down_right_regexes)
+            ]
+        )
+        return ret_str.strip()
+
+    def format_up_right_to_down_left_regexes(self) -> str:
+        """
+        Format a string listing all the regexes that will validate the lines from top right to bottom left.
+
+        :return: the formatted string.
+        :rtype: str
+        """
+        ret_str = 'Up Right -> Down Left:\n'
+        ret_str += '\n'.join(
+            [
+                f'{i}: {regex.pattern}'
+                for i, regex in enumerate(self.up_right_to_down_left_regexes)
+            ]
+        )
+        return ret_str.strip()
+
     def format_utd_ltr_regexes(self) -> str:
         """
         Format both `up_to_down` and `left_to_right` together (aka the standard checks).
@@ -158,6 +219,8 @@ class Level:
             format_list.append(self.format_up_to_down_regexes())
         if any(regex.pattern for regex in self.left_to_right_regexes):
             format_list.append(self.format_left_to_right_regexes())
+        if any(regex.pattern for regex in self.up_left_to_down_right_regexes):
+            format_list.append(self.format_up_left_to_down_right_regexes())
         return '\n\n'.join(format_list).strip()
 
     def format_dtu_rtl_regexes(self) -> str:
@@ -172,6 +235,8 @@ class Level:
             format_list.append(self.format_down_to_up_regexes())
         if any(regex.pattern for regex in self.right_to_left_regexes):
             format_list.append(self.format_right_to_left_regexes())
+        if any(regex.pattern for regex in self.up_right_to_down_left_regexes):
+            format_list.append(self.format_up_right_to_down_left_regexes())
         return '\n\n'.join(format_list).strip()
 
     def __str__(self) -> str:
@@ -184,4 +249,8 @@ class Level:
             format_list.append(self.format_left_to_right_regexes())
         if any(regex.pattern for regex in self.right_to_left_regexes):
             format_list.append(self.format_right_to_left_regexes())
+        if any(regex.pattern for regex in self.up_left_to_down_right_regexes):
+            format_list.append(self.format_up_left_to_down_right_regexes())
+        if any(regex.pattern for regex in self.up_right_to_down_left_regexes):
+            format_list.append(self.format_up_right_to_down_left_regexes())
         return '\n\n'.join(format_list).strip()
@@ -0,0 +1,151 @@
+import dataclasses
+import hashlib
+import itertools
+import typing
+from pathlib import Path
+
+from .level import Level
+from .level_pack import LevelPack, find_level_pack_paths
+from .regex_ast import canonicalize_pattern
+
+
+@dataclasses.dataclass(frozen=True)
+class LevelLocation:
+    """
+    Dataclass for storing where a certain level can be found.
+    """
+
+    pack_title: str
+    level_index: int
+    level_title: str
+
+
+def _canonicalize_lines(
+    regexes: typing.List, alt_regexes: typing.List
+) -> typing.List[typing.Tuple[str, str]]:
+    """
+    Canonicalize the lines (rows or columns) of a level, each line given by its regex and alternative regex.
+    The lines keep their order, since the crossing lines constrain their cells by position.
+
+    :param regexes: the standard regexes of the lines (`up_to_down` or `left_to_right`).
+    :type regexes: typing.List
+    :param alt_regexes: the alternative regexes of the lines (`down_to_up` or `right_to_left`).
+    :type alt_regexes: typing.List
+    :return: list of lines, each a sorted pair of canonical patterns
+        (both regexes of a line are matched against the same string, so their order doesn't matter).
+    :rtype: typing.List[typing.Tuple[str, str]]
+    """
+    lines = []
+    for regex, alt_regex in itertools.zip_longest(regexes, alt_regexes):
+        patterns = [regex.pattern if regex else '', alt_regex.pattern if alt_regex else '']
+        lines.append(tuple(sorted(canonicalize_pattern(pattern) for pattern in patterns)))
+    return lines
+
+
+def fingerprint_level(level: Level) -> str:
+    """
+    Fingerprint a level by its canonicalized regexes.
+    Levels share the same fingerprint only if they are the same puzzle: they differ by transposition,
+    by swapping the two regexes of a line, or by trivial rewrites of their patterns.
+    Reordering rows or columns isn't allowed, since that changes which cells the crossing lines constrain.
+
+    :param level: the level to fingerprint.
+    :type level: Level
+    :return: hex digest identifying the level.
+    :rtype: str
+    """
+    if level.shape == 'hexagonal':
+        axes = [
+            _canonicalize_lines(regexes, [])
+            for regexes in (
+                level.left_to_right_regexes,
+                level.up_left_to_down_right_regexes,
+                level.up_right_to_down_left_regexes,
+            )
+        ]
+        return hashlib.sha1(repr(('hexagonal', axes)).encode()).hexdigest()
+    rows = _canonicalize_lines(level.left_to_right_regexes, level.right_to_left_regexes)
+    columns = _canonicalize_lines(level.up_to_down_regexes, level.down_to_up_regexes)
+    canonical_level = min(repr((rows, columns)), repr((columns, rows)))
+    return hashlib.sha1(canonical_level.encode()).hexdigest()
+
+
+class LevelIndex:
+    """
+    Class that indexes levels by their fingerprint, to find duplicate levels across level packs.
+    """
+
+    def __init__(self):
+        self._locations: typing.Dict[str, typing.List[LevelLocation]] = {}
+
+    @classmethod
+    def from_directory(cls, level_packs_path: Path) -> 'LevelIndex':
+        """
+        Create an index of all the levels in all the level packs found in the given directory.
+
+        :param level_packs_path: path to a directory containing level packs.
+        :type level_packs_path: Path
+        :return: the created index.
+        :rtype: LevelIndex
+        """
+        index = cls()
+        for pack_path in find_level_pack_paths(level_packs_path):
+            index.add_pack(LevelPack(pack_path))
+        return index
+
+    def add_level(self, level: Level, location: LevelLocation) -> str:
+        """
+        Add a single level to the index.
+
+        :param level: the level to add.
+        :type level: Level
+        :param location: where the level can be found.
+        :type location: LevelLocation
+        :return: the fingerprint of the level.
+        :rtype: str
+        """
+        fingerprint = fingerprint_level(level)
+        self._locations.setdefault(fingerprint, []).append(location)
+        return fingerprint
+
+    def add_pack(self, pack: LevelPack) -> None:
+        """
+        Add all the levels of a level pack to the index.
+
+        :param pack: the level pack to add.
+        :type pack: LevelPack
+        :return: none.
+        :rtype: None
+        """
+        for i, level in enumerate(pack):
+            self.add_level(level, LevelLocation(pack.title, i, level.title))
+
+    def locations(self, level: Level) -> typing.List[LevelLocation]:
+        """
+        Return the locations of all the indexed levels identical to the given one.
+
+        :param level: the level to look for.
+        :type level: Level
+        :return: list of locations (empty if the level isn't indexed).
+        :rtype: typing.List[LevelLocation]
+        """
+        return list(self._locations.get(fingerprint_level(level), []))
+
+    def duplicates(self) -> typing.Dict[str, typing.List[LevelLocation]]:
+        """
+        Return all the fingerprints that were indexed more than once, along with their locations.
+
+        :return: dict mapping between a fingerprint and the locations of the levels sharing it.
+        :rtype: typing.Dict[str, typing.List[LevelLocation]]
+        """
+        return {
+            fingerprint: list(locations)
+            for fingerprint, locations in self._locations.items()
+            if len(locations) > 1
+        }
+
+    def __contains__(self, level: Level) -> bool:
+        return fingerprint_level(level) in self._locations
+
+    def __len__(self) -> int:
+        return len(self._locations)
@@ -1,19 +1,164 @@
+import hashlib
 import json
+import re
+import typing
 from pathlib import Path
 
-from .level import Level
+from .level import REGEX_FIELDS, Level, serialize_level_data
+from .level_report import LevelReport, analyze_level
+
+DIFFICULTY_SUFFIX = '.difficulty'  # Suffix of the files storing the difficulty scores of a pack.
+PARTIAL_SUFFIX = '.partial'  # Suffix of packs that are still being written.
+
+
+def hash_pack_text(pack_text: str) -> str:
+    """
+    Hash the raw text of a level pack, to tell whether it changed.
+
+    :param pack_text: the raw JSON text of the pack.
+    :type pack_text: str
+    :return: hex digest of the text.
+    :rtype: str
+    """
+    return hashlib.sha256(pack_text.encode()).hexdigest()
+
+
+def read_difficulty_scores(
+    pack_path: Path, pack_hash: str = None
+) -> typing.Optional[typing.List[float]]:
+    """
+    Read the difficulty scores stored alongside a level pack.
+
+    :param pack_path: path to the level pack.
+    :type pack_path: Path
+    :param pack_hash: hash of the pack's text, computed from the pack if not given, defaults to None
+    :type pack_hash: str, optional
+    :return: the score of each level in the pack, or None if there are no up to date scores.
+    :rtype: typing.Optional[typing.List[float]]
+    """
+    difficulty_path = pack_path.with_suffix(DIFFICULTY_SUFFIX)
+    if not difficulty_path.exists():
+        return None
+    if pack_hash is None:
+        pack_hash = hash_pack_text(pack_path.read_text())
+    difficulty_data = json.loads(difficulty_path.read_text())
+    if difficulty_data.get('pack_hash') != pack_hash:
+        return None
+    return difficulty_data.get('scores')
+
+
+def _level_key(level_data: typing.Any) -> str:
+    """
+    Return the key a level's data is loaded under, so an unchanged level is reused when its pack
+    is reloaded. Uses the same serialization as `Level.data_hash`.
+
+    :param level_data: the level's data, as stored in its pack (not necessarily a valid level).
+    :type level_data: typing.Any
+    :return: the level's key.
+    :rtype: str
+    """
+    return serialize_level_data(level_data)
+
+
+def _find_overflowing_pattern(level_data: typing.Dict) -> typing.Optional[str]:
+    """
+    Find the pattern of a level whose repeat counts are too large for the regex engine,
+    which raises OverflowError for them instead of re.error.
+
+    :param level_data: the level's data, as stored in its pack.
+    :type level_data: typing.Dict
+    :return: the first such pattern, or None if there is none.
+    :rtype: typing.Optional[str]
+    """
+    for field in REGEX_FIELDS:
+        for pattern in level_data.get(field, []):
+            try:
+                re.compile(pattern)
+            except OverflowError:
+                return pattern
+            except re.error:
+                pass
+    return None
+
+
+def load_level(
+    level_data: typing.Dict,
+) -> typing.Tuple[typing.Optional[Level], LevelReport]:
+    """
+    Create a level from its data and inspect it.
+
+    :param level_data: the level's data, as stored in its pack.
+    :type level_data: typing.Dict
+    :return: tuple of the level (None if it couldn't be created at all) and its report.
+    :rtype: typing.Tuple[typing.Optional[Level], LevelReport]
+    """
+    try:
+        level = Level(level_data)
+    except re.error as e:
+        return None, LevelReport(impossible_patterns=[f'{e.pattern} ({e})'])
+    except OverflowError as e:
+        return None, LevelReport(
+            impossible_patterns=[f'{_find_overflowing_pattern(level_data)} ({e})']
+        )
+    except ValueError as e:
+        return None, LevelReport(shape_errors=[str(e)])
+    return level, analyze_level(level, level_data)
 
 
 class LevelPack:
     """
     Class that serves as a container to multiple levels.
-    Initialized from a path to a JSON file describing one.
+    Initialized from a path to a JSON file describing one,
+    and optionally a previously loaded version of it whose unchanged levels are reused.
+    Every level is inspected once when it's loaded, and levels that can't be played
+    (mismatched shapes, patterns that can never match) are left out of the pack.
     """
 
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, *, previous: 'LevelPack' = None):
         self.title = str(path.stem)
-        self._raw_data = json.loads(path.read_text())
-        self.levels = [Level(lvl) for lvl in self._raw_data]
+        raw_text = path.read_text()
+        self.hash = hash_pack_text(raw_text)
+        self._raw_data = json.loads(raw_text)
+        if not isinstance(self._raw_data, list):
+            raise ValueError(f'Level pack {path} must be a list of levels.')
+        known_levels = previous._levels_by_data if previous is not None else {}
+        self._levels_by_data: typing.Dict[
+            str, typing.Tuple[typing.Optional[Level], LevelReport]
+        ] = {
+            key: known_levels[key] if key in known_levels else load_level(lvl)
+            for key, lvl in ((_level_key(lvl), lvl) for lvl in self._raw_data)
+        }  # Every loaded level and its report by its raw data, so reloading the pack reuses the unchanged ones.
+        loaded_levels = [self._levels_by_data[_level_key(lvl)] for lvl in self._raw_data]
+        self.levels = [level for level, report in loaded_levels if report.valid]
+        self.reports = [
+            report for level, report in loaded_levels if report.valid
+        ]  # The report of each level in `levels`.
+        self.rejected_levels = [
+            (lvl.get('title') if isinstance(lvl, dict) else None, report)
+            for lvl, (level, report) in zip(self._raw_data, loaded_levels)
+            if not report.valid
+        ]  # The title and report of each level left out of the pack.
+        self.difficulty_scores = read_difficulty_scores(
+            path, self.hash
+        )  # The score of each level, if they were precomputed for this version of the pack.
+        if self.difficulty_scores is not None and len(self.difficulty_scores) != len(
+            self.levels
+        ):
+            self.difficulty_scores = None
+
+    def sort_by_difficulty(self) -> None:
+        """
+        Sort the levels from easiest to hardest, if their difficulty scores are available.
+
+        :return: none.
+        :rtype: None
+        """
+        if self.difficulty_scores is None:
+            return
+        order = sorted(range(len(self.levels)), key=lambda i: self.difficulty_scores[i])
+        self.levels = [self.levels[i] for i in order]
+        self.reports = [self.reports[i] for i in order]
+        self.difficulty_scores = [self.difficulty_scores[i] for i in order]
 
     def __iter__(self):
         return iter(self.levels)
@@ -23,3 +168,19 @@ class LevelPack:
 
     def __len__(self) -> int:
         return len(self.levels)
+
+
+def find_level_pack_paths(level_packs_path: Path) -> typing.List[Path]:
+    """
+    Return the paths of all the level packs found in the given directory, sorted by name.
+
+    :param level_packs_path: path to a directory containing level packs.
+    :type level_packs_path: Path
+    :return: sorted list of level pack paths.
+    :rtype: typing.List[Path]
+    """
+    return sorted(
+        path
+        for path in level_packs_path.iterdir()
+        if path.suffix not in (DIFFICULTY_SUFFIX, PARTIAL_SUFFIX)
+    )
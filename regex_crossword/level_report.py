@@ -0,0 +1,94 @@
+import dataclasses
+import typing
+
+from .level import Level
+from .regex_ast import count_backreferences
+from .solver import INPUT_ALPHABET, build_line_nfa, level_regexes
+
+AXES = {
+    'square': (
+        ('left_to_right', 'right_to_left'),
+        ('up_to_down', 'down_to_up'),
+    ),
+    'hexagonal': (('left_to_right', 'up_left_to_down_right', 'up_right_to_down_left'),),
+}  # For each shape, the groups of regex lists that must have the same number of regexes.
+
+
+@dataclasses.dataclass
+class LevelReport:
+    """
+    Dataclass for storing what was found by inspecting a level's regexes, without solving it.
+    """
+
+    empty_patterns: int = 0  # Number of "" placeholders, which don't constrain their line.
+    backreferences: int = 0  # Number of backreferences used across the level's regexes.
+    shape_errors: typing.List[str] = dataclasses.field(
+        default_factory=list
+    )  # Why the level's regexes don't describe a valid grid.
+    impossible_patterns: typing.List[str] = dataclasses.field(
+        default_factory=list
+    )  # Patterns that can never match a line of their length.
+
+    @property
+    def valid(self) -> bool:
+        return not self.shape_errors and not self.impossible_patterns
+
+    def __str__(self) -> str:
+        problems = self.shape_errors + [
+            f'pattern can never match: {pattern}' for pattern in self.impossible_patterns
+        ]
+        if problems:
+            return '; '.join(problems)
+        return f'{self.empty_patterns} empty patterns, {self.backreferences} backreferences'
+
+
+def check_level_data(level_data: typing.Dict) -> typing.List[str]:
+    """
+    Check that the regex lists of a level's data agree on the shape of its grid.
+
+    :param level_data: the level's data, as stored in its pack.
+    :type level_data: typing.Dict
+    :return: list describing every mismatch found (empty if there are none).
+    :rtype: typing.List[str]
+    """
+    shape = level_data.get('shape', 'square')
+    if shape not in AXES:
+        return [f'unknown shape "{shape}"']
+    shape_errors = []
+    for axis in AXES[shape]:
+        counts = {name: len(level_data[name]) for name in axis if level_data.get(name)}
+        if len(set(counts.values())) > 1:
+            shape_errors.append(
+                'mismatched number of regexes: '
+                + ', '.join(f'{count} {name}' for name, count in counts.items())
+            )
+    return shape_errors
+
+
+def analyze_level(level: Level, level_data: typing.Dict = None) -> LevelReport:
+    """
+    Inspect a level: count its empty placeholders and backreferences, check that its regexes
+    agree on its shape, and find patterns that no string of their line's length can match.
+
+    :param level: the level to inspect.
+    :type level: Level
+    :param level_data: the data the level was created from, to check its shape, defaults to None
+    :type level_data: typing.Dict, optional
+    :return: the level's report.
+    :rtype: LevelReport
+    """
+    patterns = [regex.pattern for regex in level_regexes(level)]
+    report = LevelReport(
+        empty_patterns=patterns.count(''),
+        backreferences=sum(count_backreferences(pattern) for pattern in patterns),
+        shape_errors=check_level_data(level_data) if level_data is not None else [],
+    )
+    full_domain = (1 << len(INPUT_ALPHABET)) - 1
+    for line in level.topology.lines:
+        for regex in line.regexes:
+            # The automaton accepts a superset of what the regex matches, so rejecting a line
+            # where any character that can be entered goes proves that the regex can't match.
+            nfa = build_line_nfa(regex.pattern, INPUT_ALPHABET, len(line.cells))
+            if nfa.restrict([full_domain] * len(line.cells)) is None:
+                report.impossible_patterns.append(regex.pattern)
+    return report
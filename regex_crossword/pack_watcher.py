@@ -0,0 +1,103 @@
+import re
+import time
+import typing
+from pathlib import Path
+
+from .level_pack import DIFFICULTY_SUFFIX, LevelPack, find_level_pack_paths
+
+POLL_INTERVAL_SECONDS = 1.0  # Minimal time between two scans of the level packs directory.
+
+PackSignature = typing.Tuple[int, int, typing.Optional[int]]
+
+
+def _pack_signature(pack_path: Path) -> typing.Optional[PackSignature]:
+    """
+    Return what's cheaply known about a pack file without reading it:
+    its modification time and size, and the modification time of its difficulty scores.
+    """
+    try:
+        pack_stat = pack_path.stat()
+    except FileNotFoundError:
+        return None
+    try:
+        difficulty_mtime = pack_path.with_suffix(DIFFICULTY_SUFFIX).stat().st_mtime_ns
+    except FileNotFoundError:
+        difficulty_mtime = None
+    return pack_stat.st_mtime_ns, pack_stat.st_size, difficulty_mtime
+
+
+class PackWatcher:
+    """
+    Class that keeps the level packs of a directory loaded for long lived processes,
+    picking up new, changed and removed packs without restarting.
+    Only packs whose files changed are read again, and their unchanged levels are reused
+    (along with their compiled regexes). The loaded packs are replaced as a whole,
+    so a reader holding `packs` never sees a partially reloaded directory.
+    The standard library has no portable way to be notified of file changes, so the directory is polled.
+    """
+
+    def __init__(self, level_packs_path: Path, *, poll_interval: float = POLL_INTERVAL_SECONDS):
+        self.level_packs_path = level_packs_path
+        self.poll_interval = poll_interval
+        self.packs: typing.Dict[
+            Path, LevelPack
+        ] = {}  # The loaded packs by their path, sorted by name.
+        self._signatures: typing.Dict[Path, PackSignature] = {}
+        self._last_poll: typing.Optional[float] = None
+        self.poll(force=True)
+
+    def poll(self, *, force: bool = False) -> bool:
+        """
+        Scan the directory for changes, if enough time passed since the last scan, and reload the changed packs.
+        A pack that fails to load (e.g. while it's still being written) keeps its previous version
+        and is tried again on the next scan.
+
+        :param force: whether to scan even if the last scan was recent, defaults to False
+        :type force: bool, optional
+        :return: True if any pack was added, changed or removed, False otherwise.
+        :rtype: bool
+        """
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_poll is not None
+            and now - self._last_poll < self.poll_interval
+        ):
+            return False
+        self._last_poll = now
+        packs: typing.Dict[Path, LevelPack] = {}
+        signatures: typing.Dict[Path, PackSignature] = {}
+        changed = False
+        for pack_path in find_level_pack_paths(self.level_packs_path):
+            signature = _pack_signature(pack_path)
+            previous = self.packs.get(pack_path)
+            if signature is None:
+                changed = changed or previous is not None
+                continue
+            if previous is not None and self._signatures.get(pack_path) == signature:
+                packs[pack_path], signatures[pack_path] = previous, signature
+                continue
+            try:
+                pack = LevelPack(pack_path, previous=previous)
+            except (OSError, ValueError, KeyError, re.error):
+                if previous is not None:
+                    packs[pack_path] = previous
+                continue
+            if (
+                previous is not None
+                and pack.hash == previous.hash
+                and pack.difficulty_scores == previous.difficulty_scores
+            ):
+                pack = previous  # Only touched, keep the pack everybody already holds.
+            else:
+                changed = True
+            packs[pack_path], signatures[pack_path] = pack, signature
+        changed = changed or packs.keys() != self.packs.keys()
+        self.packs, self._signatures = packs, signatures
+        return changed
+
+    def __iter__(self) -> typing.Iterator[LevelPack]:
+        return iter(list(self.packs.values()))
+
+    def __len__(self) -> int:
+        return len(self.packs)
@@ -0,0 +1,134 @@
+import json
+import os
+import re
+import textwrap
+import typing
+from pathlib import Path
+
+from .level_pack import PARTIAL_SUFFIX
+
+SEPARATOR_REGEX = re.compile(r'\s*,?\s*')  # What separates two levels in a pack's JSON array.
+FSYNC_EVERY_LEVELS = 8  # Number of levels written to a pack between forcing it to the disk.
+RECOVER_CHUNK_SIZE = 1 << 16  # Bytes of a partial pack read at a time when picking it up.
+
+
+class PackWriter:
+    """
+    Class that writes the levels of a pack to its file one at a time, as they are parsed.
+    The levels are written to a partial file, which replaces the pack only once it's finished,
+    so a crash never leaves a broken pack behind and loses at most the level being written:
+    opening the writer again picks the partial file up from its last complete level.
+    The finished pack is exactly what `json.dumps(levels, indent=4)` would have written.
+    """
+
+    def __init__(self, path: Path, *, fsync_every: int = FSYNC_EVERY_LEVELS):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.levels_written = 0  # Number of complete levels in the partial file.
+        self._partial_path = path.with_suffix(PARTIAL_SUFFIX)
+        self._file: typing.Optional[typing.TextIO] = None
+
+    def _recover(self) -> int:
+        """
+        Find the end of the last complete level in the partial file, counting the levels before it.
+        The file is read in chunks and only the text after the last complete level is kept,
+        so recovering a large pack takes as much memory as its largest level.
+
+        :return: offset right after the last complete level (0 if there are none).
+        :rtype: int
+        """
+        decoder = json.JSONDecoder()
+        end = 0
+        text = ''
+        text_offset = 0  # Offset of the start of `text` in the file.
+        position = 0  # Where the next level (or the array's start) is looked for in `text`.
+        started = False
+        eof = False
+        with self._partial_path.open('rb') as partial_file:
+            while True:
+                if not started:
+                    start = text.find('[', position)
+                    if start != -1:
+                        position, started = start + 1, True
+                        continue
+                    position = len(text)
+                else:
+                    separator = SEPARATOR_REGEX.match(text, position)
+                    if separator.end() < len(text) or eof:
+                        if self.levels_written and ',' not in separator.group():
+                            break  # The array was closed, but the file wasn't renamed yet.
+                        try:
+                            _, level_end = decoder.raw_decode(text, separator.end())
+                        except ValueError:
+                            if eof:
+                                break  # The level that was being written when we crashed.
+                        else:
+                            position = level_end
+                            end = text_offset + level_end
+                            self.levels_written += 1
+                            continue
+                if eof:
+                    break
+                chunk = partial_file.read(RECOVER_CHUNK_SIZE)
+                eof = not chunk
+                # The levels are dumped as ASCII, so offsets in characters are also offsets in bytes.
+                text = text[position:] + chunk.decode('ascii', errors='replace')
+                text_offset += position
+                position = 0
+        return end
+
+    def open(self) -> int:
+        """
+        Open the partial file, continuing it if a previous run didn't finish it.
+
+        :return: the number of levels already written, so parsing can continue after them.
+        :rtype: int
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.levels_written = 0
+        if self._partial_path.exists():
+            end = self._recover()
+            with self._partial_path.open('r+') as partial_file:
+                partial_file.truncate(end)
+        self._file = self._partial_path.open('a')
+        return self.levels_written
+
+    def write(self, level: typing.Dict) -> None:
+        """
+        Append a single level to the partial file.
+
+        :param level: the level to write.
+        :type level: typing.Dict
+        :return: none.
+        :rtype: None
+        """
+        separator = ',\n' if self.levels_written else '[\n'
+        self._file.write(separator + textwrap.indent(json.dumps(level, indent=4), ' ' * 4))
+        self._file.flush()
+        self.levels_written += 1
+        if self.levels_written % self.fsync_every == 0:
+            os.fsync(self._file.fileno())
+
+    def finish(self) -> None:
+        """
+        Terminate the partial file and atomically replace the pack with it.
+
+        :return: none.
+        :rtype: None
+        """
+        self._file.write('\n]' if self.levels_written else '[]')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.close()
+        os.replace(self._partial_path, self.path)
+
+    def close(self) -> None:
+        """
+        Close the partial file without finishing it.
+
+        :return: none.
+        :rtype: None
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,87 @@
+import dataclasses
+import multiprocessing
+import queue
+import time
+import typing
+
+from .level import Level
+from .matrix import Matrix
+from .solver import LineSolver, Solver, brute_force_level
+
+STRATEGIES: typing.Dict[str, typing.Callable[[Level], typing.Optional[Matrix]]] = {
+    'propagation': lambda level: Solver(level).solve(),
+    'lines': lambda level: LineSolver(level).solve(),
+    'brute_force': brute_force_level,
+}  # The strategies raced against each other, by name.
+POLL_INTERVAL_SECONDS = 0.05  # How often to check for strategies that died without a result.
+
+
+@dataclasses.dataclass
+class PortfolioResult:
+    """
+    Dataclass for storing the outcome of racing several strategies on a level.
+    """
+
+    solution: typing.Optional[Matrix]  # The first solution found, or None if no strategy found one.
+    strategy: typing.Optional[str]  # The name of the strategy that found the solution.
+    seconds: float  # Time it took until the solution was found (or every strategy gave up).
+
+
+def _run_strategy(name: str, level: Level, results: multiprocessing.Queue) -> None:
+    try:
+        solution = STRATEGIES[name](level)
+    except Exception:
+        solution = None
+    results.put((name, solution))
+
+
+def solve_portfolio(
+    level: Level,
+    strategies: typing.Iterable[str] = tuple(STRATEGIES),
+    *,
+    timeout: typing.Optional[float] = None,
+) -> PortfolioResult:
+    """
+    Race several strategies on the same level, each in its own process.
+    The first solution found is returned and the processes still running are terminated.
+    A strategy that gives up (e.g. brute force on a large level) or whose process dies without a result
+    (e.g. killed for running out of memory) just leaves the race to the others.
+
+    :param level: the level to solve.
+    :type level: Level
+    :param strategies: names of the strategies to race (keys of `STRATEGIES`), defaults to all of them.
+    :type strategies: typing.Iterable[str]
+    :param timeout: seconds to wait for a solution before giving up, defaults to waiting indefinitely.
+    :type timeout: float, optional
+    :return: the solution, along with the strategy that found it.
+    :rtype: PortfolioResult
+    """
+    start = time.perf_counter()
+    results: multiprocessing.Queue = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_run_strategy, args=(name, level, results), daemon=True)
+        for name in strategies
+    ]
+    for process in processes:
+        process.start()
+    try:
+        running = len(processes)
+        while running:
+            try:
+                name, solution = results.get(timeout=POLL_INTERVAL_SECONDS)
+            except queue.Empty:
+                if timeout is not None and time.perf_counter() - start >= timeout:
+                    break
+                if all(process.exitcode is not None for process in processes) and results.empty():
+                    break  # The processes that didn't post a result died.
+                continue
+            running -= 1
+            if solution is not None:
+                return PortfolioResult(solution, name, time.perf_counter() - start)
+        return PortfolioResult(None, None, time.perf_counter() - start)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        results.close()
@@ -0,0 +1,160 @@
+import functools
+import typing
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:
+    # Python < 3.11 exposes the regex internals as top-level modules.
+    import sre_constants
+    import sre_parse
+
+PARSE_CACHE_SIZE = 4096  # Number of parsed patterns kept around, since most are parsed more than once.
+MAX_EXPANDED_RANGE = 256  # Character ranges wider than this are kept as ranges instead of being expanded.
+
+CanonicalNode = typing.Tuple  # A hashable, order-independent representation of a parsed regex node.
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_pattern(pattern: str) -> sre_parse.SubPattern:
+    """
+    Parse a regex pattern into the `sre_parse` tree used by the `re` module itself.
+    The returned tree is shared between callers and must not be modified.
+
+    :param pattern: the regex pattern to parse.
+    :type pattern: str
+    :return: the parsed pattern.
+    :rtype: sre_parse.SubPattern
+    """
+    return sre_parse.parse(pattern)
+
+
+def _canonicalize_set(items: typing.List) -> CanonicalNode:
+    """
+    Canonicalize the items of a character set (`IN`) node, ignoring the order they were written in.
+
+    :param items: the items of the `IN` node.
+    :type items: typing.List
+    :return: the canonical set node.
+    :rtype: CanonicalNode
+    """
+    negate = False
+    literals = set()
+    others = set()
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            literals.add(av)
+        elif op is sre_constants.RANGE and av[1] - av[0] < MAX_EXPANDED_RANGE:
+            literals.update(range(av[0], av[1] + 1))
+        else:
+            others.add((str(op), str(av)))
+    if not negate and not others and len(literals) == 1:
+        return ('LITERAL', literals.pop())
+    return ('IN', negate, tuple(sorted(others)), tuple(sorted(literals)))
+
+
+def _canonicalize_subpattern(subpattern: typing.Iterable) -> typing.Tuple[CanonicalNode, ...]:
+    """
+    Canonicalize a sequence of parsed regex nodes.
+
+    :param subpattern: the nodes to canonicalize.
+    :type subpattern: typing.Iterable
+    :return: tuple of canonical nodes.
+    :rtype: typing.Tuple[CanonicalNode, ...]
+    """
+    nodes = []
+    for op, av in subpattern:
+        if op is sre_constants.IN:
+            nodes.append(_canonicalize_set(av))
+        elif op is sre_constants.LITERAL:
+            nodes.append(('LITERAL', av))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            # Greediness doesn't change the language matched by a full match.
+            min_count, max_count, item = av
+            canonical_item = _canonicalize_subpattern(item)
+            if min_count == max_count == 1:
+                nodes.extend(canonical_item)
+            else:
+                nodes.append(('REPEAT', min_count, max_count, canonical_item))
+        elif op is sre_constants.SUBPATTERN:
+            group, add_flags, del_flags, item = av
+            canonical_item = _canonicalize_subpattern(item)
+            if group is None and not add_flags and not del_flags:
+                nodes.extend(canonical_item)  # A bare non-capturing group is just its contents.
+            else:
+                nodes.append(('GROUP', group, add_flags, del_flags, canonical_item))
+        elif op is sre_constants.BRANCH:
+            # Alternation order only matters for which match is found first, never for whether one is.
+            _, branches = av
+            canonical_branches = sorted(
+                (_canonicalize_subpattern(branch) for branch in branches), key=repr
+            )
+            nodes.append(('BRANCH', tuple(canonical_branches)))
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            direction, item = av
+            nodes.append((str(op), direction, _canonicalize_subpattern(item)))
+        else:
+            nodes.append((str(op), str(av)))
+    return tuple(nodes)
+
+
+def canonicalize_pattern(pattern: str) -> str:
+    """
+    Return a canonical form of the given pattern, so trivially different spellings of the same regex
+    (e.g. `A|B`, `[AB]`, `[BA]` and `(?:B|A)`) share the same canonical form.
+    Global inline flags (e.g. `(?i)`) are part of the canonical form, as they change what's matched.
+
+    :param pattern: the regex pattern to canonicalize.
+    :type pattern: str
+    :return: the canonical form of the pattern.
+    :rtype: str
+    """
+    if not pattern:
+        return ''
+    parsed = parse_pattern(pattern)
+    return repr((parsed.state.flags, _canonicalize_subpattern(parsed)))
+
+
+def iter_nodes(nodes: typing.Iterable) -> typing.Iterator[typing.Tuple]:
+    """
+    Iterate over all the nodes of a parsed regex, including the nested ones.
+
+    :param nodes: the parsed regex (or a part of it).
+    :type nodes: typing.Iterable
+    :return: iterator of (op, av) pairs.
+    :rtype: typing.Iterator[typing.Tuple]
+    """
+    for op, av in nodes:
+        yield op, av
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            yield from iter_nodes(av[2])
+        elif op is sre_constants.SUBPATTERN:
+            yield from iter_nodes(av[3])
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            yield from iter_nodes(av[1])
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                yield from iter_nodes(branch)
+        elif op is sre_constants.GROUPREF_EXISTS:
+            for item in av[1:]:
+                if item:
+                    yield from iter_nodes(item)
+
+
+def count_backreferences(pattern: str) -> int:
+    """
+    Count the backreferences used in the given pattern.
+
+    :param pattern: the regex pattern to inspect.
+    :type pattern: str
+    :return: number of backreferences.
+    :rtype: int
+    """
+    if not pattern:
+        return 0
+    return sum(
+        op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS)
+        for op, _ in iter_nodes(parse_pattern(pattern))
+    )
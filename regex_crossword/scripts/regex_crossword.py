@@ -3,6 +3,12 @@ import os
 from pathlib import Path
 
 from ..crossword import Crossword
+from ..difficulty import update_difficulty
+from ..headless import benchmark, load_trace, record_trace, replay_crossword
+from ..level_index import LevelIndex
+from ..level_pack import LevelPack, find_level_pack_paths
+from ..portfolio import solve_portfolio
+from ..solver import solve_levels
 
 try:
     from .scraper import scrape
@@ -13,6 +19,9 @@ except ImportError:
 DEFAULT_LEVEL_PACKS_PATH = Path(
     'level_packs'
 )  # Default path where level packs will be looked for.
+DEFAULT_SESSIONS_PATH = Path(
+    Path.home(), '.regex_crossword', 'sessions'
+)  # Default path where the progress of each level will be saved.
 
 SUCCESS = 0
 FAILURE = -1
@@ -35,6 +44,78 @@ def parse_args() -> argparse.Namespace:
         type=Path,
         help='Path to a directory containing the level packs',
     )
+    game_group.add_argument(
+        '--sort-by-difficulty',
+        default=False,
+        action='store_true',
+        help='Play the levels of each pack from easiest to hardest (requires `--compute-difficulty`)',
+    )
+    game_group.add_argument(
+        '--sessions',
+        metavar='PATH',
+        type=Path,
+        help='Path to a directory where the progress of each level is saved and resumed from',
+    )
+    tools_group = parser.add_argument_group(
+        'Tools arguments', 'Arguments that run maintenance tools on the level packs'
+    )
+    tools_group.add_argument(
+        '--find-duplicates',
+        default=False,
+        action='store_true',
+        help='List duplicate levels across the level packs instead of starting the game',
+    )
+    tools_group.add_argument(
+        '--check-levels',
+        default=False,
+        action='store_true',
+        help='Inspect every level and report the ones that were left out of their packs',
+    )
+    tools_group.add_argument(
+        '--compute-difficulty',
+        default=False,
+        action='store_true',
+        help='Compute and store the difficulty of the levels in changed level packs',
+    )
+    tools_group.add_argument(
+        '--solve',
+        default=False,
+        action='store_true',
+        help='Solve all the levels in the level packs and print their solutions',
+    )
+    tools_group.add_argument(
+        '--portfolio',
+        default=False,
+        action='store_true',
+        help='When solving, race several strategies on each level (one process per strategy)',
+    )
+    tools_group.add_argument(
+        '--workers',
+        metavar='N',
+        type=int,
+        help='Number of worker processes used by the tools (defaults to the number of CPUs)',
+    )
+    benchmark_group = parser.add_argument_group(
+        'Benchmark arguments', 'Arguments for recording and replaying game sessions headlessly'
+    )
+    benchmark_group.add_argument(
+        '--record',
+        metavar='TRACE',
+        type=Path,
+        help='Record every key pressed while playing into a trace file',
+    )
+    benchmark_group.add_argument(
+        '--replay',
+        metavar='TRACE',
+        type=Path,
+        help='Replay a recorded trace file headlessly and report how long each key took to handle',
+    )
+    benchmark_group.add_argument(
+        '--benchmark',
+        default=False,
+        action='store_true',
+        help='Replay synthetic traces headlessly against grids from 5x5 to 50x50',
+    )
     scraper_group = parser.add_argument_group(
         'scraper arguments', 'Arguments given to the scraper'
     )
@@ -53,24 +134,156 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def game_main(level_packs_path: Path) -> None:
+def game_main(
+    level_packs_path: Path,
+    sessions_path: Path,
+    sort_by_difficulty: bool = False,
+    record_path: Path = None,
+) -> None:
     """
     Create a new Crossword instance and start the game's mainloop.
 
     :param level_packs_path: path to a directory containing level packs.
     :type level_packs_path: Path
+    :param sessions_path: path to a directory where the progress of each level is saved.
+    :type sessions_path: Path
+    :param sort_by_difficulty: whether to play the levels from easiest to hardest, defaults to False
+    :type sort_by_difficulty: bool, optional
+    :param record_path: where to record the pressed keys to, defaults to None
+    :type record_path: Path, optional
     :return: none.
     :rtype: None
     """
-    cw = Crossword(level_packs_path)
+    cw = Crossword(
+        level_packs_path, sort_by_difficulty=sort_by_difficulty, sessions_path=sessions_path
+    )
     try:
-        cw.mainloop()
+        if record_path is not None:
+            with record_trace(record_path):
+                cw.mainloop()
+        else:
+            cw.mainloop()
     except KeyboardInterrupt:
         pass
     finally:
         print('Thank you for playing!')
 
 
+def find_duplicates_main(level_packs_path: Path) -> None:
+    """
+    Index all the levels in the level packs and print the ones that are duplicates of each other.
+
+    :param level_packs_path: path to a directory containing level packs.
+    :type level_packs_path: Path
+    :return: none.
+    :rtype: None
+    """
+    duplicates = LevelIndex.from_directory(level_packs_path).duplicates()
+    for locations in duplicates.values():
+        print(
+            ', '.join(
+                f'{location.pack_title}[{location.level_index}] "{location.level_title}"'
+                for location in locations
+            )
+        )
+    print(f'Found {len(duplicates)} duplicated levels.')
+
+
+def check_levels_main(level_packs_path: Path) -> None:
+    """
+    Load all the level packs and print the report of each level, including the levels that were rejected.
+
+    :param level_packs_path: path to a directory containing level packs.
+    :type level_packs_path: Path
+    :return: none.
+    :rtype: None
+    """
+    rejected = 0
+    for pack_path in find_level_pack_paths(level_packs_path):
+        pack = LevelPack(pack_path)
+        for i, (level, report) in enumerate(zip(pack, pack.reports)):
+            print(f'{pack.title}[{i}] "{level.title}": {report}')
+        for title, report in pack.rejected_levels:
+            print(f'{pack.title} "{title}" was rejected: {report}')
+        rejected += len(pack.rejected_levels)
+    print(f'Found {rejected} rejected levels.')
+
+
+def compute_difficulty_main(level_packs_path: Path, workers: int = None) -> None:
+    """
+    Compute the difficulty of the levels in all the changed level packs and store them alongside the packs.
+
+    :param level_packs_path: path to a directory containing level packs.
+    :type level_packs_path: Path
+    :param workers: number of worker processes, defaults to the number of CPUs.
+    :type workers: int, optional
+    :return: none.
+    :rtype: None
+    """
+    updated = update_difficulty(level_packs_path, workers=workers)
+    for pack_path in updated:
+        print(f'Updated the difficulty of {pack_path.stem}.')
+    print(f'Updated {len(updated)} level packs.')
+
+
+def solve_main(level_packs_path: Path, workers: int = None, portfolio: bool = False) -> None:
+    """
+    Solve all the levels in the level packs at once and print their solutions.
+
+    :param level_packs_path: path to a directory containing level packs.
+    :type level_packs_path: Path
+    :param workers: number of worker processes, defaults to the number of CPUs.
+    :type workers: int, optional
+    :param portfolio: whether to race several strategies on each level in turn instead, defaults to False
+    :type portfolio: bool, optional
+    :return: none.
+    :rtype: None
+    """
+    packs = [LevelPack(pack_path) for pack_path in find_level_pack_paths(level_packs_path)]
+    levels = [level for pack in packs for level in pack]
+    if portfolio:
+        results = iter(solve_portfolio(level) for level in levels)
+    else:
+        results = iter(solve_levels(levels, workers=workers))
+    for pack in packs:
+        for i, level in enumerate(pack):
+            result = next(results)
+            solution = result.solution if portfolio else result
+            if solution is None:
+                print(f'{pack.title}[{i}] "{level.title}": no solution')
+                continue
+            rows = (''.join(solution[row]) for row in range(solution.rows))
+            strategy = (
+                f' ({result.strategy}, {result.seconds * 1000:.1f}ms)' if portfolio else ''
+            )
+            print(f'{pack.title}[{i}] "{level.title}": {" / ".join(rows)}{strategy}')
+
+
+def replay_main(level_packs_path: Path, trace_path: Path) -> None:
+    """
+    Replay a recorded trace headlessly against the level packs and print its measurements.
+
+    :param level_packs_path: path to a directory containing level packs.
+    :type level_packs_path: Path
+    :param trace_path: path to the trace file.
+    :type trace_path: Path
+    :return: none.
+    :rtype: None
+    """
+    print(replay_crossword(Crossword(level_packs_path), load_trace(trace_path)))
+
+
+def benchmark_main() -> None:
+    """
+    Replay synthetic traces headlessly against grids of increasing sizes and print their measurements.
+
+    :return: none.
+    :rtype: None
+    """
+    for size, report in benchmark().items():
+        print(f'{size}x{size}: {report}')
+
+
 def cli() -> int:
     """
     Main entry point for the CLI.
@@ -87,6 +300,9 @@ def cli() -> int:
             return FAILURE
         scrape(args.output)
         return SUCCESS
+    if args.benchmark:
+        benchmark_main()
+        return SUCCESS
     level_packs: Path = (
         args.level_packs
         if args.level_packs
@@ -96,5 +312,28 @@ def cli() -> int:
         print(f'Directory {level_packs} doesn\'t exist.')
         print('If you don\'t have any level packs, consider using the `--scrape` flag.')
         return FAILURE
-    game_main(level_packs)
+    if args.find_duplicates:
+        find_duplicates_main(level_packs)
+        return SUCCESS
+    if args.check_levels:
+        check_levels_main(level_packs)
+        return SUCCESS
+    if args.compute_difficulty:
+        compute_difficulty_main(level_packs, args.workers)
+        return SUCCESS
+    if args.solve:
+        if args.portfolio and args.workers is not None:
+            print('`--portfolio` runs one process per strategy and can\'t be used with `--workers`.')
+            return FAILURE
+        solve_main(level_packs, args.workers, args.portfolio)
+        return SUCCESS
+    if args.replay:
+        replay_main(level_packs, args.replay)
+        return SUCCESS
+    sessions: Path = (
+        args.sessions
+        if args.sessions
+        else Path(os.environ.get('REGEXCW_SESSIONS', DEFAULT_SESSIONS_PATH))
+    )
+    game_main(level_packs, sessions, args.sort_by_difficulty, args.record)
     return SUCCESS
@@ -1,4 +1,3 @@
-import json
 import typing
 from pathlib import Path
 
@@ -6,10 +5,12 @@ import bs4
 from loguru import logger
 from selenium import webdriver
 
+from ..pack_writer import PackWriter
+
 ROOT_SITE = 'https://regexcrossword.com'  # Where to scrape from.
 CHALLENGES_BLACKLIST = [
     'hexagonal'
-]  # We just don't support some freaky challenge types. Sorry.
+]  # Hexagonal pages aren't laid out as a table, so `parse_level` can't parse them (yet).
 
 level_dict_type = typing.Dict[str, typing.Union[str, typing.List[str]]]
 pack_dict_type = typing.Dict[str, typing.Union[str, level_dict_type]]
@@ -48,31 +49,48 @@ def parse_level(content: str) -> level_dict_type:
     }
 
 
-def parse_pack(driver: webdriver.Chrome, pack_url: str) -> pack_dict_type:
+def iter_pack_levels(
+    driver: webdriver.Chrome, pack_url: str, *, start: int = 1
+) -> typing.Iterator[level_dict_type]:
     """
-    Parse the various levels in a pic into a pack_dict.
+    Parse the various levels in a pack one at a time, so only a single level is held in memory.
 
     :param driver: the current session webdriver.
     :type driver: webdriver.Chrome
     :param pack_url: main url of the pack.
     :type pack_url: str
-    :return: dict tontaining the title and various levels of a pack.
-    :rtype: pack_dict_type
+    :param start: the number of the first level to parse, defaults to 1
+    :type start: int, optional
+    :return: iterator of the parsed level_dicts.
+    :rtype: typing.Iterator[level_dict_type]
     """
     logger.info(f'parsing pack {pack_url}')
-    levels = []
-    i = 1
+    i = start
     while True:
         logger.debug(f'parsing level {i}')
         level_url = f'{pack_url}/{i}'
         driver.get(level_url)
         try:
-            levels.append(parse_level(driver.page_source))
+            level = parse_level(driver.page_source)
         except Exception:
             logger.warning(f'got exception, treating pack {pack_url} as finished')
             break
+        yield level
         i += 1
-    return {'title': pack_url.split('/')[-2], 'levels': levels}
+
+
+def parse_pack(driver: webdriver.Chrome, pack_url: str) -> pack_dict_type:
+    """
+    Parse the various levels in a pic into a pack_dict.
+
+    :param driver: the current session webdriver.
+    :type driver: webdriver.Chrome
+    :param pack_url: main url of the pack.
+    :type pack_url: str
+    :return: dict tontaining the title and various levels of a pack.
+    :rtype: pack_dict_type
+    """
+    return {'title': pack_url.split('/')[-2], 'levels': list(iter_pack_levels(driver, pack_url))}
 
 
 def get_challenge_packs(content: str) -> typing.List[str]:
@@ -108,8 +126,17 @@ def scrape(output_path: Path) -> None:
     driver.get(ROOT_SITE)
     challenge_packs = get_challenge_packs(driver.page_source)
     for i, pack_route in enumerate(challenge_packs):
-        pack = parse_pack(driver, f'{ROOT_SITE}{pack_route}/puzzles')
-        path_to_pack = Path(output_path, f'{i}_{pack["title"]}').with_suffix('.json')
-        path_to_pack.parent.mkdir(parents=True, exist_ok=True)
-        path_to_pack.write_text(json.dumps(pack['levels'], indent=4))
+        pack_url = f'{ROOT_SITE}{pack_route}/puzzles'
+        path_to_pack = Path(output_path, f'{i}_{pack_url.split("/")[-2]}').with_suffix('.json')
+        writer = PackWriter(path_to_pack)
+        try:
+            levels_written = writer.open()
+            if levels_written:
+                logger.info(f'resuming {path_to_pack} after {levels_written} levels')
+            start = levels_written + 1
+            for level in iter_pack_levels(driver, pack_url, start=start):
+                writer.write(level)
+            writer.finish()
+        finally:
+            writer.close()
     logger.info('done!')
@@ -0,0 +1,639 @@
+import concurrent.futures
+import dataclasses
+import functools
+import itertools
+import os
+import re
+import typing
+
+from .level import Level
+from .matrix import Matrix
+from .regex_ast import parse_pattern, sre_constants
+from .topology import Cell, Line
+
+INPUT_ALPHABET = ''.join(
+    chr(code) for code in range(32, 127) if not chr(code).islower()
+)  # Every character a player can enter in a cell: printable ASCII, upper-cased.
+
+CATEGORY_REGEXES = {
+    sre_constants.CATEGORY_DIGIT: re.compile(r'\d'),
+    sre_constants.CATEGORY_NOT_DIGIT: re.compile(r'\D'),
+    sre_constants.CATEGORY_SPACE: re.compile(r'\s'),
+    sre_constants.CATEGORY_NOT_SPACE: re.compile(r'\S'),
+    sre_constants.CATEGORY_WORD: re.compile(r'\w'),
+    sre_constants.CATEGORY_NOT_WORD: re.compile(r'\W'),
+}  # Regexes matching a single character of each `re` category.
+
+NFA_CACHE_SIZE = 4096  # Number of automatons kept around for reuse by other lines and levels.
+LINE_CANDIDATES_LIMIT = 100000  # Most strings a line is enumerated against when solving line by line.
+BRUTE_FORCE_LIMIT = 200000  # Most grids tried when brute forcing a level.
+
+CharSet = typing.FrozenSet[str]
+Domain = int  # Bitmask over an alphabet, the i-th bit set if the i-th character is possible.
+
+
+@dataclasses.dataclass
+class SolveStats:
+    """
+    Dataclass for storing measurements of the effort it took to solve a level.
+    """
+
+    propagation_rounds: int = 0  # Number of times a line was revised against its regexes.
+    branches: int = 0  # Number of guesses made while searching.
+    backtracks: int = 0  # Number of guesses that led to a contradiction.
+
+
+class LineNFA:
+    """
+    Class that holds a nondeterministic automaton over sets of characters, built from a regex.
+    The automaton over-approximates the regex: any string the regex fully matches is accepted by it,
+    which makes it safe to use for pruning (backreferences and lookarounds are approximated).
+    Its transitions are labeled with bitmasks over the given alphabet, matching `Domain`.
+    """
+
+    def __init__(self, pattern: str, alphabet: typing.Sequence[str], max_length: int):
+        self._alphabet = frozenset(alphabet)
+        self._bits = {char: 1 << i for i, char in enumerate(alphabet)}
+        self._max_length = max_length
+        self._epsilon: typing.List[typing.List[int]] = []
+        self._edges: typing.List[typing.List[typing.Tuple[Domain, int]]] = []
+        self._groups: typing.Dict[int, typing.List] = {}
+        self._masks: typing.Dict[typing.Tuple[int, str], Domain] = {}  # Cache of `_char_mask`.
+        parsed = parse_pattern(pattern)
+        self._ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+        start, end = self._build(parsed)
+        self.start = start
+        self.transitions, self.accepting = self._remove_epsilons(end)
+
+    def _new_state(self) -> int:
+        """
+        Add a state without any transitions to the automaton.
+
+        :return: the index of the new state.
+        :rtype: int
+        """
+        self._epsilon.append([])
+        self._edges.append([])
+        return len(self._edges) - 1
+
+    def _char_set(self, op, av) -> CharSet:
+        """
+        Return the characters of the alphabet matched by a single-character regex node.
+        """
+        if op is sre_constants.ANY:
+            return frozenset(c for c in self._alphabet if c != '\n')
+        items = av if op is sre_constants.IN else [(op, av)]
+        negate = False
+        matched = set()
+        for item_op, item_av in items:
+            if item_op is sre_constants.NEGATE:
+                negate = True
+            elif item_op is sre_constants.LITERAL:
+                matched.update(self._literal_chars(item_av))
+            elif item_op is sre_constants.NOT_LITERAL:
+                negate = True
+                matched.update(self._literal_chars(item_av))
+            elif item_op is sre_constants.RANGE:
+                low, high = item_av
+                variants = (lambda c: (c, c.lower(), c.upper())) if self._ignore_case else tuple
+                matched.update(
+                    c
+                    for c in self._alphabet
+                    if any(low <= ord(v) <= high for v in variants(c))
+                )
+            elif item_op is sre_constants.CATEGORY and item_av in CATEGORY_REGEXES:
+                matched.update(c for c in self._alphabet if CATEGORY_REGEXES[item_av].match(c))
+            else:
+                return self._alphabet  # Unknown set items, assume anything can match.
+        return self._alphabet - matched if negate else frozenset(matched)
+
+    def _literal_chars(self, code: int) -> CharSet:
+        """
+        Return the characters of the alphabet matched by a literal, along with its other cases
+        if the pattern ignores case.
+
+        :param code: the code point of the literal.
+        :type code: int
+        :return: set of matched characters (empty if the literal isn't in the alphabet).
+        :rtype: CharSet
+        """
+        char = chr(code)
+        if self._ignore_case:
+            return self._alphabet & {char, char.lower(), char.upper()}
+        return self._alphabet & {char}
+
+    def _to_mask(self, char_set: CharSet) -> Domain:
+        return sum(self._bits[char] for char in char_set)
+
+    def _char_mask(self, op, av) -> Domain:
+        """
+        Return the bitmask of the characters matched by a single-character regex node.
+        Repetitions build the same nodes many times over, so the masks are cached.
+        """
+        key = (op, repr(av))
+        if key not in self._masks:
+            self._masks[key] = self._to_mask(self._char_set(op, av))
+        return self._masks[key]
+
+    def _build(self, nodes: typing.Iterable) -> typing.Tuple[int, int]:
+        """
+        Build the automaton fragment for a sequence of regex nodes, returning its start and end states.
+        """
+        start = end = self._new_state()
+        for op, av in nodes:
+            node_start, node_end = self._build_node(op, av)
+            self._epsilon[end].append(node_start)
+            end = node_end
+        return start, end
+
+    def _build_node(self, op, av) -> typing.Tuple[int, int]:
+        """
+        Build the automaton fragment for a single regex node.
+        Nodes the automaton can't express exactly are over-approximated: backreferences by their
+        group's contents, assertions by the empty string and anything unknown by any string.
+
+        :param op: the node's opcode.
+        :type op: int
+        :param av: the node's arguments.
+        :type av: typing.Any
+        :return: tuple of the fragment's start and end states.
+        :rtype: typing.Tuple[int, int]
+        """
+        if op in (
+            sre_constants.LITERAL,
+            sre_constants.NOT_LITERAL,
+            sre_constants.IN,
+            sre_constants.ANY,
+        ):
+            start, end = self._new_state(), self._new_state()
+            self._edges[start].append((self._char_mask(op, av), end))
+            return start, end
+        if op is sre_constants.SUBPATTERN:
+            group, _, _, item = av
+            if group is not None:
+                self._groups[group] = item
+            return self._build(item)
+        if op is sre_constants.GROUPREF and av in self._groups:
+            # A backreference matches some string its group matched, so its group's language contains it.
+            return self._build(self._groups[av])
+        if op is sre_constants.GROUPREF_EXISTS:
+            _, yes_item, no_item = av
+            return self._build_branches([yes_item, no_item or []])
+        if op is sre_constants.BRANCH:
+            return self._build_branches(av[1])
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            return self._build_repeat(*av)
+        if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            state = self._new_state()
+            return state, state
+        # Anything else is approximated as "any string".
+        state = self._new_state()
+        self._edges[state].append((self._to_mask(self._alphabet), state))
+        return state, state
+
+    def _build_branches(self, branches: typing.Iterable) -> typing.Tuple[int, int]:
+        start, end = self._new_state(), self._new_state()
+        for branch in branches:
+            branch_start, branch_end = self._build(branch)
+            self._epsilon[start].append(branch_start)
+            self._epsilon[branch_end].append(end)
+        return start, end
+
+    def _build_repeat(self, min_count: int, max_count, item) -> typing.Tuple[int, int]:
+        # A line can't hold more than `max_length` non-empty repetitions,
+        # so capping the counts keeps the automaton small without changing what it accepts.
+        min_count = min(min_count, self._max_length + 1)
+        unbounded = max_count is sre_constants.MAXREPEAT or max_count > self._max_length
+        start = end = self._new_state()
+        for _ in range(min_count):
+            item_start, item_end = self._build(item)
+            self._epsilon[end].append(item_start)
+            end = item_end
+        if unbounded:
+            item_start, item_end = self._build(item)
+            self._epsilon[end].append(item_start)
+            self._epsilon[item_end].append(end)
+            return start, end
+        optional_ends = [end]
+        for _ in range(max_count - min_count):
+            item_start, item_end = self._build(item)
+            self._epsilon[end].append(item_start)
+            end = item_end
+            optional_ends.append(end)
+        final = self._new_state()
+        for optional_end in optional_ends:
+            self._epsilon[optional_end].append(final)
+        return start, final
+
+    def _remove_epsilons(
+        self, end: int
+    ) -> typing.Tuple[typing.List[typing.List[typing.Tuple[Domain, int]]], typing.FrozenSet[int]]:
+        """
+        Fold the epsilon transitions into the character transitions and compute the accepting states.
+        """
+        closures = []
+        for state in range(len(self._edges)):
+            closure = {state}
+            stack = [state]
+            while stack:
+                for next_state in self._epsilon[stack.pop()]:
+                    if next_state not in closure:
+                        closure.add(next_state)
+                        stack.append(next_state)
+            closures.append(closure)
+        transitions = [
+            [
+                (mask, target)
+                for closed_state in closures[state]
+                for mask, target in self._edges[closed_state]
+                if mask
+            ]
+            for state in range(len(self._edges))
+        ]
+        accepting = frozenset(state for state in range(len(closures)) if end in closures[state])
+        return transitions, accepting
+
+    def restrict(self, domains: typing.List[Domain]) -> typing.Optional[typing.List[Domain]]:
+        """
+        Restrict the domains of a line's cells to the characters that appear in some accepted string.
+
+        :param domains: the possible characters of each cell in the line.
+        :type domains: typing.List[Domain]
+        :return: the restricted domains, or None if no string in the domains is accepted.
+        :rtype: typing.Optional[typing.List[Domain]]
+        """
+        length = len(domains)
+        forward = [{self.start}]
+        for domain in domains:
+            forward.append(
+                {
+                    target
+                    for state in forward[-1]
+                    for mask, target in self.transitions[state]
+                    if mask & domain
+                }
+            )
+        backward = self.accepting & forward[length]
+        if not backward:
+            return None
+        restricted = [0] * length
+        for i in range(length - 1, -1, -1):
+            allowed = 0
+            previous = set()
+            domain = domains[i]
+            for state in forward[i]:
+                for mask, target in self.transitions[state]:
+                    if target in backward and mask & domain:
+                        allowed |= mask & domain
+                        previous.add(state)
+            restricted[i] = allowed
+            backward = previous
+        return restricted
+
+
+def level_regexes(level: Level) -> typing.Iterator[typing.Pattern]:
+    """
+    Iterate over all the regexes of a level.
+
+    :param level: the level to inspect.
+    :type level: Level
+    :return: iterator of all the level's regexes.
+    :rtype: typing.Iterator[typing.Pattern]
+    """
+    return itertools.chain(
+        level.up_to_down_regexes,
+        level.down_to_up_regexes,
+        level.left_to_right_regexes,
+        level.right_to_left_regexes,
+        level.up_left_to_down_right_regexes,
+        level.up_right_to_down_left_regexes,
+    )
+
+
+@functools.lru_cache(maxsize=NFA_CACHE_SIZE)
+def build_line_nfa(pattern: str, alphabet: str, max_length: int) -> LineNFA:
+    """
+    Build the automaton of a pattern, reusing the one built for a previous line or level if possible.
+    The automatons are never modified once built, so they are safe to share.
+
+    :param pattern: the regex pattern.
+    :type pattern: str
+    :param alphabet: the characters the automaton's bitmasks refer to, in order.
+    :type alphabet: str
+    :param max_length: length of the line the pattern is matched against.
+    :type max_length: int
+    :return: the automaton of the pattern.
+    :rtype: LineNFA
+    """
+    return LineNFA(pattern, alphabet, max_length)
+
+
+class _Line:
+    """
+    Class holding a single constrained line of a level, along with the automatons of its regexes.
+    """
+
+    def __init__(self, line: Line, alphabet: str):
+        self.cells = line.cells
+        self.regexes = line.regexes
+        self.nfas = [
+            build_line_nfa(regex.pattern, alphabet, len(self.cells)) for regex in self.regexes
+        ]
+
+
+class Solver:
+    """
+    Class that solves a level by propagating the constraints of its regexes over the possible
+    characters of each cell (kept as bitmasks), and searching over the cells left ambiguous.
+    """
+
+    def __init__(self, level: Level, *, max_branches: typing.Optional[int] = None):
+        self.level = level
+        self.max_branches = max_branches
+        self.stats = SolveStats()
+        self._matrix = level.create_matrix()
+        self._alphabet = INPUT_ALPHABET
+        self._lines = [
+            _Line(line, self._alphabet)
+            for line in level.topology.lines
+        ]
+        self._cell_lines: typing.Dict[Cell, typing.List[_Line]] = {
+            cell: [] for cell in level.topology.cells
+        }
+        for line in self._lines:
+            for cell in line.cells:
+                self._cell_lines.setdefault(cell, []).append(line)
+
+    def _propagate(
+        self, domains: typing.Dict[Cell, Domain], pending: typing.List[_Line]
+    ) -> bool:
+        """
+        Revise the pending lines (and any line crossing a changed cell) until nothing changes.
+        Fully assigned lines are checked against the actual regexes, so backreferences are enforced.
+
+        :return: False if a contradiction was found, True otherwise.
+        :rtype: bool
+        """
+        pending = list(pending)
+        queued = set(map(id, pending))
+        while pending:
+            line = pending.pop()
+            queued.discard(id(line))
+            self.stats.propagation_rounds += 1
+            line_domains = [domains[cell] for cell in line.cells]
+            for nfa in line.nfas:
+                line_domains = nfa.restrict(line_domains)
+                if line_domains is None:
+                    return False
+            if all(domain & (domain - 1) == 0 for domain in line_domains):
+                line_str = ''.join(
+                    self._alphabet[domain.bit_length() - 1] for domain in line_domains
+                )
+                if any(regex.fullmatch(line_str) is None for regex in line.regexes):
+                    return False
+            for cell, domain in zip(line.cells, line_domains):
+                if domain != domains[cell]:
+                    domains[cell] = domain
+                    for crossing_line in self._cell_lines[cell]:
+                        if crossing_line is not line and id(crossing_line) not in queued:
+                            queued.add(id(crossing_line))
+                            pending.append(crossing_line)
+        return True
+
+    def _search(self, domains: typing.Dict[Cell, Domain]) -> typing.Optional[typing.Dict]:
+        ambiguous = [cell for cell, domain in domains.items() if domain & (domain - 1)]
+        if not ambiguous:
+            return domains
+        cell = min(ambiguous, key=lambda c: bin(domains[c]).count('1'))
+        domain = domains[cell]
+        while domain:
+            bit = domain & -domain
+            domain ^= bit
+            if self.max_branches is not None and self.stats.branches >= self.max_branches:
+                return None
+            self.stats.branches += 1
+            guess = dict(domains)
+            guess[cell] = bit
+            if self._propagate(guess, self._cell_lines[cell]):
+                solution = self._search(guess)
+                if solution is not None:
+                    return solution
+            self.stats.backtracks += 1
+        return None
+
+    def solve(self) -> typing.Optional[Matrix]:
+        """
+        Solve the level.
+
+        :return: a matrix validated against the level, or None if no solution was found.
+        :rtype: typing.Optional[Matrix]
+        """
+        full_domain = (1 << len(self._alphabet)) - 1
+        domains = {cell: full_domain for cell in self.level.topology.cells}
+        if not self._propagate(domains, self._lines):
+            return None
+        solution = self._search(domains)
+        if solution is None:
+            return None
+        for (i, j), domain in solution.items():
+            self._matrix[i][j] = self._alphabet[domain.bit_length() - 1]
+        return self._matrix if self.level.check_matrix(self._matrix) else None
+
+
+def _domain_chars(alphabet: str, domain: Domain) -> str:
+    """
+    Return the characters of a domain, in the alphabet's order.
+
+    :param alphabet: the characters the domain's bits refer to.
+    :type alphabet: str
+    :param domain: the domain to expand.
+    :type domain: Domain
+    :return: string of the domain's characters.
+    :rtype: str
+    """
+    return ''.join(char for i, char in enumerate(alphabet) if domain >> i & 1)
+
+
+def _count_bits(domain: Domain) -> int:
+    """
+    Return the number of characters a domain allows.
+
+    :param domain: the domain to count.
+    :type domain: Domain
+    :return: number of set bits.
+    :rtype: int
+    """
+    return bin(domain).count('1')
+
+
+class LineSolver:
+    """
+    Class that solves a level by backtracking over whole lines instead of single cells:
+    each step picks the line with the fewest possible strings, and tries every string that
+    fully matches its regexes (so backreferences are enforced as soon as a line is filled).
+    This suits levels whose lines are tied together by backreferences, which propagating
+    over single cells barely narrows down.
+    """
+
+    def __init__(self, level: Level, *, max_candidates: int = LINE_CANDIDATES_LIMIT):
+        self.level = level
+        self.max_candidates = max_candidates
+        self._alphabet = INPUT_ALPHABET
+        self._lines = [_Line(line, self._alphabet) for line in level.topology.lines]
+        self._cell_lines: typing.Dict[Cell, typing.List[_Line]] = {
+            cell: [] for cell in level.topology.cells
+        }
+        for line in self._lines:
+            for cell in line.cells:
+                self._cell_lines.setdefault(cell, []).append(line)
+
+    @staticmethod
+    def _restrict(
+        line: _Line, domains: typing.Dict[Cell, Domain]
+    ) -> typing.Optional[typing.List[Domain]]:
+        line_domains: typing.Optional[typing.List[Domain]] = [
+            domains[cell] for cell in line.cells
+        ]
+        for nfa in line.nfas:
+            line_domains = nfa.restrict(line_domains)
+            if line_domains is None:
+                return None
+        return line_domains
+
+    def _candidates(
+        self, line: _Line, line_domains: typing.List[Domain]
+    ) -> typing.Iterator[str]:
+        for chars in itertools.product(
+            *(_domain_chars(self._alphabet, domain) for domain in line_domains)
+        ):
+            line_str = ''.join(chars)
+            if all(regex.fullmatch(line_str) is not None for regex in line.regexes):
+                yield line_str
+
+    def _search(
+        self, domains: typing.Dict[Cell, Domain], lines: typing.List[_Line]
+    ) -> typing.Optional[typing.Dict[Cell, Domain]]:
+        if not lines:
+            return domains
+        best = None
+        for line in lines:
+            line_domains = self._restrict(line, domains)
+            if line_domains is None:
+                return None
+            size = functools.reduce(lambda x, y: x * y, map(_count_bits, line_domains), 1)
+            if best is None or size < best[0]:
+                best = (size, line, line_domains)
+        size, line, line_domains = best
+        if size > self.max_candidates:
+            return None
+        remaining = [other for other in lines if other is not line]
+        for line_str in self._candidates(line, line_domains):
+            guess = dict(domains)
+            for cell, char in zip(line.cells, line_str):
+                guess[cell] = 1 << self._alphabet.index(char)
+            solution = self._search(guess, remaining)
+            if solution is not None:
+                return solution
+        return None
+
+    def solve(self) -> typing.Optional[Matrix]:
+        """
+        Solve the level.
+
+        :return: a matrix validated against the level, or None if no solution was found.
+        :rtype: typing.Optional[Matrix]
+        """
+        full_domain = (1 << len(self._alphabet)) - 1
+        domains = {cell: full_domain for cell in self.level.topology.cells}
+        solution = self._search(domains, self._lines)
+        if solution is None:
+            return None
+        matrix = self.level.create_matrix()
+        for (i, j), domain in solution.items():
+            # Cells that aren't part of any line can hold anything, take the first possibility.
+            matrix[i][j] = self._alphabet[(domain & -domain).bit_length() - 1]
+        return matrix if self.level.check_matrix(matrix) else None
+
+
+def brute_force_level(
+    level: Level, *, limit: int = BRUTE_FORCE_LIMIT
+) -> typing.Optional[Matrix]:
+    """
+    Solve a small level by trying every grid, after narrowing each cell down by a single pass
+    over the automatons of its lines. Levels with more than `limit` grids left to try are given up on.
+
+    :param level: the level to solve.
+    :type level: Level
+    :param limit: most grids to try, defaults to `BRUTE_FORCE_LIMIT`.
+    :type limit: int, optional
+    :return: a matrix validated against the level, or None if no solution was found.
+    :rtype: typing.Optional[Matrix]
+    """
+    full_domain = (1 << len(INPUT_ALPHABET)) - 1
+    domains = {cell: full_domain for cell in level.topology.cells}
+    for line in level.topology.lines:
+        line_domains = LineSolver._restrict(_Line(line, INPUT_ALPHABET), domains)
+        if line_domains is None:
+            return None
+        for cell, domain in zip(line.cells, line_domains):
+            domains[cell] &= domain
+    cells = list(domains)
+    if functools.reduce(lambda x, y: x * y, map(_count_bits, domains.values()), 1) > limit:
+        return None
+    matrix = level.create_matrix()
+    for chars in itertools.product(
+        *(_domain_chars(INPUT_ALPHABET, domains[cell]) for cell in cells)
+    ):
+        for (i, j), char in zip(cells, chars):
+            matrix[i][j] = char
+        if level.check_matrix(matrix):
+            return matrix
+    return None
+
+
+def solve_level(level: Level) -> typing.Optional[Matrix]:
+    """
+    Solve the given level.
+
+    :param level: the level to solve.
+    :type level: Level
+    :return: a matrix validated against the level, or None if it has no solution.
+    :rtype: typing.Optional[Matrix]
+    """
+    return Solver(level).solve()
+
+
+def solve_levels(
+    levels: typing.Iterable[Level],
+    *,
+    workers: typing.Optional[int] = None,
+    chunk_size: int = 16,
+) -> typing.List[typing.Optional[Matrix]]:
+    """
+    Solve many levels, spreading them in chunks over a pool of worker processes.
+    If the `numpy` extra is installed, each worker solves its whole chunk together,
+    propagating the constraints of all its levels at once with array operations
+    (see `batch_solver.solve_batch`), and the chunks are made as large as spreading the levels
+    evenly over the workers allows. Otherwise every level is solved on its own, and the only thing
+    shared between the levels a worker solves is the cache of parsed patterns and automatons.
+
+    :param levels: the levels to solve.
+    :type levels: typing.Iterable[Level]
+    :param workers: number of worker processes, defaults to the number of CPUs.
+    :type workers: int, optional
+    :param chunk_size: number of levels sent to a worker at a time without `numpy`, defaults to 16
+    :type chunk_size: int, optional
+    :return: the solution of each level, in order (None for levels without a solution).
+    :rtype: typing.List[typing.Optional[Matrix]]
+    """
+    try:
+        from .batch_solver import BATCH_SIZE, solve_chunk
+    except ImportError:
+        # This means the user haven't installed the `numpy` extra, which is fine.
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(solve_level, levels, chunksize=chunk_size))
+    levels = list(levels)
+    batch_size = max(1, min(BATCH_SIZE, -(-len(levels) // (workers or os.cpu_count() or 1))))
+    chunks = [levels[start : start + batch_size] for start in range(0, len(levels), batch_size)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return [solution for chunk in executor.map(solve_chunk, chunks) for solution in chunk]
@@ -0,0 +1,271 @@
+import abc
+import dataclasses
+import itertools
+import typing
+
+from .matrix import Matrix
+from .utils import Coordinate
+
+Cell = typing.Tuple[int, int]  # (row, column) of a cell in the level's matrix.
+
+DIRECTIONS = ('up', 'down', 'left', 'right')  # Directions the cursor can be moved in.
+
+
+@dataclasses.dataclass(frozen=True)
+class Line:
+    """
+    Dataclass for storing a single constrained line of a level: its cells in reading order,
+    and the (non-empty) regexes it has to match.
+    """
+
+    cells: typing.Tuple[Cell, ...]
+    regexes: typing.Tuple[typing.Pattern, ...]
+
+    def read(self, mat: Matrix) -> str:
+        """
+        Read the line's string from the given matrix.
+
+        :param mat: the matrix to read from.
+        :type mat: Matrix
+        :return: the characters of the line's cells, in reading order.
+        :rtype: str
+        """
+        return ''.join([mat[row][col] for row, col in self.cells])
+
+    def matches(self, mat: Matrix) -> bool:
+        """
+        Check if the line's string in the given matrix matches all of the line's regexes.
+
+        :param mat: the matrix to check.
+        :type mat: Matrix
+        :return: True if every regex fully matches the line, False otherwise.
+        :rtype: bool
+        """
+        line_str = self.read(mat)
+        return all(regex.fullmatch(line_str) is not None for regex in self.regexes)
+
+
+def _create_line(cells: typing.Iterable[Cell], regexes: typing.Iterable) -> Line:
+    return Line(
+        tuple(cells), tuple(regex for regex in regexes if regex is not None and regex.pattern)
+    )
+
+
+class Topology(abc.ABC):
+    """
+    Class holding the geometry of a level, computed once when the level is loaded:
+    which cells of its matrix are used, the cells of every constrained line,
+    where each cell is drawn and where the cursor moves from it.
+    """
+
+    def __init__(
+        self, rows: int, columns: int, cells: typing.List[Cell], lines: typing.List[Line]
+    ):
+        self.rows = rows  # Number of rows in the level's matrix.
+        self.columns = columns  # Number of columns in the level's matrix.
+        self.cells = cells  # The cells of the matrix that are part of the level.
+        self.lines = [
+            line for line in lines if line.regexes
+        ]  # Lines without any regex don't constrain anything.
+        self.positions: typing.Dict[Cell, Coordinate] = {
+            cell: self._position(cell) for cell in cells
+        }  # Where each cell is drawn in the rendered matrix.
+        self.moves: typing.Dict[typing.Tuple[Cell, str], Cell] = {
+            (cell, direction): target
+            for cell in cells
+            for direction in DIRECTIONS
+            for target in [self._move(cell, direction)]
+            if target is not None
+        }  # Where the cursor moves to from each cell in each direction.
+
+    @abc.abstractmethod
+    def _position(self, cell: Cell) -> Coordinate:
+        """
+        Return where the given cell is drawn in the rendered matrix.
+        """
+
+    @abc.abstractmethod
+    def _move(self, cell: Cell, direction: str) -> typing.Optional[Cell]:
+        """
+        Return the cell the cursor moves to from the given cell, or None if it would leave the level.
+        """
+
+    def move(self, cell: Cell, direction: str) -> Cell:
+        """
+        Return the cell the cursor moves to from the given cell in the given direction.
+
+        :param cell: the current cell.
+        :type cell: Cell
+        :param direction: one of `DIRECTIONS`.
+        :type direction: str
+        :raises IndexError: if moving would take the cursor off the level.
+        :return: the cell moved to.
+        :rtype: Cell
+        """
+        try:
+            return self.moves[cell, direction]
+        except KeyError:
+            raise IndexError('Cursor got off the matrix') from None
+
+    @abc.abstractmethod
+    def render(self, mat: Matrix) -> str:
+        """
+        Render the given matrix as a string, drawing each cell at its position.
+
+        :param mat: the matrix to render.
+        :type mat: Matrix
+        :return: the rendered matrix.
+        :rtype: str
+        """
+
+    def check_matrix(self, mat: Matrix) -> bool:
+        """
+        Check if a given matrix matches every constrained line.
+
+        :param mat: the matrix to validate.
+        :type mat: Matrix
+        :raises ValueError: if the matrix isn't shaped like the level.
+        :return: True if the matrix has been validated successfully, False otherwise.
+        :rtype: bool
+        """
+        if mat.rows != self.rows:
+            raise ValueError(
+                f'Matrix with {mat.rows} rows is incompatible with level of {self.rows} rows.'
+            )
+        if mat.columns != self.columns:
+            raise ValueError(
+                f'Matrix with {mat.columns} columns is incompatible with level of {self.columns} columns.'
+            )
+        return all(line.matches(mat) for line in self.lines)
+
+
+class SquareTopology(Topology):
+    """
+    Class holding the geometry of a standard level, whose rows and columns are constrained.
+    """
+
+    def __init__(
+        self,
+        left_to_right: typing.List,
+        right_to_left: typing.List,
+        up_to_down: typing.List,
+        down_to_up: typing.List,
+    ):
+        rows = max(len(left_to_right), len(right_to_left))
+        columns = max(len(up_to_down), len(down_to_up))
+        lines = [
+            _create_line(((i, j) for j in range(columns)), regexes)
+            for i, regexes in enumerate(itertools.zip_longest(left_to_right, right_to_left))
+        ] + [
+            _create_line(((i, j) for i in range(rows)), regexes)
+            for j, regexes in enumerate(itertools.zip_longest(up_to_down, down_to_up))
+        ]
+        cells = [(i, j) for i in range(rows) for j in range(columns)]
+        super().__init__(rows, columns, cells, lines)
+
+    def _position(self, cell: Cell) -> Coordinate:
+        return Coordinate(2 + 2 * cell[0], 4 + 4 * cell[1])
+
+    def _move(self, cell: Cell, direction: str) -> typing.Optional[Cell]:
+        row, col = cell
+        row += {'up': -1, 'down': 1}.get(direction, 0)
+        col += {'left': -1, 'right': 1}.get(direction, 0)
+        if 0 <= row < self.rows and 0 <= col < self.columns:
+            return row, col
+        return None
+
+    def render(self, mat: Matrix) -> str:
+        return str(mat)
+
+
+class HexagonalTopology(Topology):
+    """
+    Class holding the geometry of a hexagonal level, whose lines run along three axes.
+    The cells are stored in axial coordinates: row `r` and column `q` of the matrix,
+    where lines of a fixed `q` run from the top left to the bottom right,
+    and lines of a fixed `q + r` run from the top right to the bottom left.
+    """
+
+    def __init__(
+        self,
+        left_to_right: typing.List,
+        up_left_to_down_right: typing.List,
+        up_right_to_down_left: typing.List,
+    ):
+        size = max(len(left_to_right), len(up_left_to_down_right), len(up_right_to_down_left))
+        if size % 2 == 0:
+            raise ValueError(f'Hexagonal level must have an odd number of lines, not {size}.')
+        self.side = (size + 1) // 2  # Number of cells along each side of the hexagon.
+        self._row_cells = [
+            [(r, q) for q in range(size) if self._is_cell(r, q)] for r in range(size)
+        ]
+        lines = (
+            [
+                _create_line(self._row_cells[r], [regex])
+                for r, regex in enumerate(left_to_right)
+            ]
+            + [
+                _create_line(
+                    ((r, q) for r in range(size) if self._is_cell(r, q)), [regex]
+                )
+                for q, regex in enumerate(up_left_to_down_right)
+            ]
+            + [
+                _create_line(
+                    ((r, s - r) for r in range(size) if self._is_cell(r, s - r)), [regex]
+                )
+                for s, regex in enumerate(up_right_to_down_left, self.side - 1)
+            ]
+        )
+        cells = [cell for row_cells in self._row_cells for cell in row_cells]
+        super().__init__(size, size, cells, lines)
+
+    def _is_cell(self, r: int, q: int) -> bool:
+        center = self.side - 1
+        return (
+            0 <= r < 2 * self.side - 1
+            and 0 <= q < 2 * self.side - 1
+            and abs((q - center) + (r - center)) <= center
+        )
+
+    def _indent(self, r: int) -> int:
+        return 1 + 2 * abs(r - (self.side - 1))
+
+    def _position(self, cell: Cell) -> Coordinate:
+        r, q = cell
+        return Coordinate(1 + 2 * r, self._indent(r) + 2 + 4 * self._row_cells[r].index(cell))
+
+    def _move(self, cell: Cell, direction: str) -> typing.Optional[Cell]:
+        r, q = cell
+        if direction in ('left', 'right'):
+            target = (r, q + (1 if direction == 'right' else -1))
+            return target if self._is_cell(*target) else None
+        target_row = r + (1 if direction == 'down' else -1)
+        if not 0 <= target_row < self.rows:
+            return None
+        x = self._position(cell).col
+        # Move to the nearest cell of the next row, preferring the left one when they're as near.
+        return min(
+            self._row_cells[target_row],
+            key=lambda target: (abs(self._position(target).col - x), self._position(target).col),
+        )
+
+    def render(self, mat: Matrix) -> str:
+        row_lengths = [len(row_cells) for row_cells in self._row_cells]
+        render_lines = [' ' * (self._indent(0) + 1) + '/ \\ ' * row_lengths[0]]
+        for r, row_cells in enumerate(self._row_cells):
+            render_lines.append(
+                ' ' * self._indent(r)
+                + ''.join(
+                    '| {} '.format(mat[row][col] if mat[row][col] != '\0' else ' ')
+                    for row, col in row_cells
+                )
+                + '|'
+            )
+            if r + 1 < self.rows and row_lengths[r + 1] > row_lengths[r]:
+                render_lines.append(
+                    ' ' * (self._indent(r + 1) + 1) + '/ \\ ' * row_lengths[r + 1]
+                )
+            else:
+                render_lines.append(' ' * (self._indent(r) + 1) + '\\ / ' * row_lengths[r])
+        return '\n'.join(render_line.rstrip() for render_line in render_lines)
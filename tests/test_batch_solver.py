@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+
+from regex_crossword.level import Level
+from regex_crossword.level_pack import LevelPack, find_level_pack_paths
+from regex_crossword.solver import Solver, solve_levels
+
+batch_solver = pytest.importorskip('regex_crossword.batch_solver')
+
+LEVEL_PACKS_PATH = Path(__file__).parent.parent / 'level_packs'
+UNSOLVABLE_LEVEL = Level({'left_to_right': ['A', 'B'], 'up_to_down': ['[AB]C']})
+
+
+@pytest.fixture(scope='module')
+def levels():
+    paths = find_level_pack_paths(LEVEL_PACKS_PATH)
+    return [level for path in paths for level in LevelPack(path).levels] + [UNSOLVABLE_LEVEL]
+
+
+@pytest.mark.parametrize('batch_size', [batch_solver.BATCH_SIZE, 7])
+def test_batch_matches_solver(levels, batch_size):
+    solutions, given_up = batch_solver.solve_batch(levels, batch_size=batch_size)
+    for i, (level, solution) in enumerate(zip(levels, solutions)):
+        if i in given_up:
+            assert solution is None
+        elif solution is None:
+            assert Solver(level).solve() is None, level.title
+        else:
+            assert level.check_matrix(solution), level.title
+    assert solutions[-1] is None and len(levels) - 1 not in given_up
+
+
+def test_given_up_levels_fall_back(levels):
+    _, given_up = batch_solver.solve_batch(levels, max_branches=2)
+    assert given_up
+    solutions = batch_solver.solve_chunk([levels[i] for i in given_up])
+    assert all(levels[i].check_matrix(solution) for i, solution in zip(given_up, solutions))
+
+
+def test_solve_levels_in_batches(levels):
+    solutions = solve_levels(levels, workers=2)
+    assert solutions[-1] is None
+    assert all(level.check_matrix(solution) for level, solution in zip(levels[:-1], solutions))
@@ -0,0 +1,19 @@
+import json
+
+from regex_crossword.difficulty import update_difficulty
+from regex_crossword.level_pack import DIFFICULTY_SUFFIX
+
+
+def test_equivalent_looking_levels_are_scored_separately(tmp_path):
+    pack_path = tmp_path / 'pack.json'
+    pack_path.write_text(
+        json.dumps(
+            [
+                {'title': 'solvable', 'left_to_right': ['A.', 'B.'], 'up_to_down': ['AB', '..']},
+                {'title': 'unsolvable', 'left_to_right': ['B.', 'A.'], 'up_to_down': ['AB', '..']},
+            ]
+        )
+    )
+    assert update_difficulty(tmp_path, workers=1) == [pack_path]
+    levels = json.loads(pack_path.with_suffix(DIFFICULTY_SUFFIX).read_text())['levels']
+    assert sorted(level['solved'] for level in levels.values()) == [False, True]
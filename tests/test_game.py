@@ -0,0 +1,49 @@
+import curses
+
+from regex_crossword.game import PASTE_END, PASTE_START, Game, split_pastes
+from regex_crossword.headless import HeadlessScreen, TraceExhausted, synthetic_level
+
+
+def _play(level, trace) -> Game:
+    game = Game(level)
+    with HeadlessScreen(trace).install():
+        try:
+            game.play_level()
+        except TraceExhausted:
+            pass
+    return game
+
+
+def test_split_pastes():
+    keys = [ord('A'), *PASTE_START, *b'BC\n', *PASTE_END, curses.KEY_LEFT]
+    assert split_pastes(keys) == [ord('A'), 'BC', curses.KEY_LEFT]
+
+
+def test_paste_fills_row():
+    game = _play(synthetic_level(2, 3), [{'paste': 'ABC'}])
+    assert game.matrix[0] == ['A', 'B', 'C']
+    assert (game.matrix_cursor_pos.row, game.matrix_cursor_pos.col) == (0, 2)
+
+
+def test_keys_arriving_together_are_typed_in_place():
+    game = _play(synthetic_level(2, 3), [{'burst': 'AB'}])
+    assert game.matrix[0] == ['B', '\0', '\0']
+    assert (game.matrix_cursor_pos.row, game.matrix_cursor_pos.col) == (0, 0)
+
+
+def test_line_entry_prompt():
+    trace = ['KEY_BTAB', 'A', 'X', 'KEY_BACKSPACE', 'B', 'ENTER']
+    game = _play(synthetic_level(2, 2), trace)
+    assert [game.matrix[0][0], game.matrix[1][0]] == ['A', 'B']
+
+
+def test_paste_into_line_entry_prompt():
+    level = synthetic_level(2, 6)
+    game = Game(level)
+    with HeadlessScreen(['TAB', {'paste': 'ABC'}, 'ENTER']).install():
+        try:
+            result = game.play_level()
+        except TraceExhausted:
+            result = None
+    assert result is None  # The paste's escape sequences neither cancelled the prompt nor quit.
+    assert game.matrix[0] == ['A', 'B', 'C', '\0', '\0', '\0']
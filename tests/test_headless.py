@@ -0,0 +1,61 @@
+import curses
+from pathlib import Path
+
+import pytest
+
+from regex_crossword.crossword import Crossword
+from regex_crossword.game import PASTE_END, PASTE_START, Game
+from regex_crossword.headless import (
+    FakeWindow,
+    HeadlessScreen,
+    _RecordingWindow,
+    load_trace,
+    replay_crossword,
+    replay_level,
+    synthetic_level,
+    synthetic_trace,
+)
+from regex_crossword.level_pack import LevelPack
+
+LEVEL_PACKS_PATH = Path(__file__).parent.parent / 'level_packs'
+TRACES_PATH = Path(__file__).parent / 'traces'
+
+
+@pytest.mark.parametrize('size', [5, 10, 20, 50])
+def test_replay_synthetic_grid(size):
+    trace = synthetic_trace(size, size)
+    report = replay_level(synthetic_level(size, size), trace)
+    assert report.events == len(trace)
+    assert report.frames > 0
+    assert not hasattr(curses, 'LINES')  # The fake terminal is gone once the replay is over.
+
+
+def test_replay_recorded_trace(tmp_path):
+    crossword = Crossword(LEVEL_PACKS_PATH, sessions_path=tmp_path)
+    report = replay_crossword(crossword, load_trace(TRACES_PATH / 'tutorial.json'))
+    assert report.events == 10
+    # The second level was typed into after paging to it, then the first level was paged back to
+    # and solved (so its session was discarded), which moved on to the second level again.
+    pack = LevelPack(LEVEL_PACKS_PATH / '0_tutorial.json')
+    sessions = {path.stem for path in (tmp_path / pack.title).iterdir()}
+    assert sessions == {pack[1].data_hash}
+    game = Game(pack[1], journal_path=tmp_path / pack.title / pack[1].data_hash)
+    assert game.journal.restore()
+    assert game.matrix[0][0] == 'X'
+
+
+def test_recording_resize_keeps_new_size():
+    screen = HeadlessScreen([{'resize': [30, 90]}])
+    trace = []
+    with screen.install():
+        _RecordingWindow(FakeWindow(screen, 10, 10), trace).getch()
+    assert trace == [{'resize': [30, 90]}]
+
+
+def test_recording_collapses_pastes():
+    screen = HeadlessScreen(['A', {'paste': 'BC'}, 'ESC'])
+    trace = []
+    window = _RecordingWindow(FakeWindow(screen, 10, 10), trace)
+    for _ in range(1 + len(PASTE_START) + 2 + len(PASTE_END) + 1):
+        window.getch()
+    assert trace == ['A', {'paste': 'BC'}, 'ESC']
@@ -0,0 +1,83 @@
+import curses
+import json
+
+from regex_crossword import crossword
+from regex_crossword.crossword import Crossword
+from regex_crossword.game import Game
+from regex_crossword.headless import (
+    HeadlessScreen,
+    TraceExhausted,
+    replay_crossword,
+    swap_attributes,
+    synthetic_level,
+)
+from regex_crossword.journal import JOURNAL_SUFFIX
+from regex_crossword.level import Level
+from regex_crossword.level_index import fingerprint_level
+
+
+def test_pending_edits_are_written_once_idle(tmp_path):
+    session_path = tmp_path / 'level'
+    journal_path = session_path.with_suffix(JOURNAL_SUFFIX)
+    journal_sizes = []
+
+    def trace():
+        yield 'A'
+        yield 'KEY_RIGHT'
+        yield 'B'
+        journal_sizes.append(journal_path.exists())
+        yield curses.ERR  # The read timed out, nothing was pressed for a while.
+        journal_sizes.append(len(journal_path.read_text().splitlines()))
+
+    screen = HeadlessScreen(trace())
+    with screen.install():
+        try:
+            Game(synthetic_level(3, 3), journal_path=session_path).play_level()
+        except TraceExhausted:
+            pass
+    assert journal_sizes == [False, 2]
+
+
+def test_journal_restores_progress(tmp_path):
+    session_path = tmp_path / 'level'
+    level = synthetic_level(2, 2)
+    screen = HeadlessScreen(['A', 'KEY_DOWN', 'B', 'ESC'])
+    with screen.install():
+        Game(level, journal_path=session_path).play_level()
+    game = Game(level, journal_path=session_path)
+    screen = HeadlessScreen(['ESC'])
+    with screen.install():
+        game.play_level()
+    assert game.matrix[0][0] == 'A' and game.matrix[1][0] == 'B'
+
+
+def test_equivalent_levels_get_separate_sessions(tmp_path):
+    level_data = {'title': 'level', 'left_to_right': ['A.', 'B.'], 'up_to_down': ['AB', '..']}
+    transposed_data = {
+        'title': 'transposed',
+        'up_to_down': ['A.', 'B.'],
+        'left_to_right': ['AB', '..'],
+    }
+    assert fingerprint_level(Level(level_data)) == fingerprint_level(Level(transposed_data))
+    packs_path = tmp_path / 'packs'
+    packs_path.mkdir()
+    (packs_path / 'pack.json').write_text(json.dumps([level_data, transposed_data]))
+    sessions_path = tmp_path / 'sessions'
+    # Type a different letter in each level, paging from the first level to the second.
+    replay_crossword(
+        Crossword(packs_path, sessions_path=sessions_path),
+        ['0', 'A', 'KEY_PPAGE', 'B', 'ESC', 'ESC'],
+    )
+    games = []
+
+    class RecordingGame(Game):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            games.append(self)
+
+    with swap_attributes(crossword, Game=RecordingGame):
+        replay_crossword(
+            Crossword(packs_path, sessions_path=sessions_path), ['0', 'KEY_PPAGE', 'ESC', 'ESC']
+        )
+    assert [game.matrix[0] for game in games] == [['A', '\0'], ['B', '\0']]
+    assert [game.matrix[1] for game in games] == [['\0', '\0'], ['\0', '\0']]
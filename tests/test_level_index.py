@@ -0,0 +1,28 @@
+from regex_crossword.level import Level
+from regex_crossword.level_index import fingerprint_level
+from regex_crossword.regex_ast import canonicalize_pattern
+
+
+def test_transposed_levels_share_fingerprint():
+    level = Level({'left_to_right': ['A.', 'B.'], 'up_to_down': ['AB', '..']})
+    transposed = Level({'up_to_down': ['A.', 'B.'], 'left_to_right': ['AB', '..']})
+    assert fingerprint_level(level) == fingerprint_level(transposed)
+
+
+def test_rewritten_patterns_share_fingerprint():
+    level = Level({'left_to_right': ['A|B'], 'up_to_down': ['.']})
+    rewritten = Level({'left_to_right': ['[AB]'], 'up_to_down': ['.']})
+    assert fingerprint_level(level) == fingerprint_level(rewritten)
+
+
+def test_reordered_rows_differ():
+    level = Level({'left_to_right': ['A.', 'B.'], 'up_to_down': ['AB', '..']})
+    reordered = Level({'left_to_right': ['B.', 'A.'], 'up_to_down': ['AB', '..']})
+    assert fingerprint_level(level) != fingerprint_level(reordered)
+
+
+def test_global_flags_are_canonical():
+    assert canonicalize_pattern('(?i)a') != canonicalize_pattern('a')
+    level = Level({'left_to_right': ['a'], 'up_to_down': ['.']})
+    ignoring_case = Level({'left_to_right': ['(?i)a'], 'up_to_down': ['.']})
+    assert fingerprint_level(level) != fingerprint_level(ignoring_case)
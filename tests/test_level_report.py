@@ -0,0 +1,37 @@
+import json
+
+from regex_crossword.difficulty import compute_difficulty
+from regex_crossword.level_pack import LevelPack, load_level
+from regex_crossword.solver import LineSolver, Solver, brute_force_level
+
+
+def test_level_solved_by_symbols_is_kept(tmp_path):
+    level_data = {'up_to_down': ['[^\\w\\s]'], 'left_to_right': ['[^A-Z0-9 ]']}
+    level, report = load_level(level_data)
+    assert report.valid, report
+    pack_path = tmp_path / 'pack.json'
+    pack_path.write_text(json.dumps([level_data]))
+    assert len(LevelPack(pack_path)) == 1
+    for solve in (Solver(level).solve, LineSolver(level).solve, lambda: brute_force_level(level)):
+        solution = solve()
+        assert solution is not None and level.check_matrix(solution)
+    assert compute_difficulty(level).solved
+
+
+def test_impossible_patterns_are_rejected():
+    level, report = load_level({'left_to_right': ['ABC'], 'up_to_down': ['A', 'B']})
+    assert report.impossible_patterns == ['ABC']
+    level, report = load_level({'left_to_right': ['ab'], 'up_to_down': ['.', '.']})
+    assert report.impossible_patterns == ['ab']
+
+
+def test_mismatched_shapes_are_rejected():
+    level, report = load_level(
+        {'left_to_right': ['A', 'B'], 'right_to_left': ['A'], 'up_to_down': ['AB']}
+    )
+    assert not report.valid and report.shape_errors
+
+
+def test_report_counts():
+    level, report = load_level({'left_to_right': ['(A)\\1', ''], 'up_to_down': ['A.', 'A.']})
+    assert (report.empty_patterns, report.backreferences) == (1, 1)
@@ -0,0 +1,50 @@
+import json
+import os
+
+from regex_crossword.pack_watcher import PackWatcher
+
+LEVEL = {'title': 'level', 'left_to_right': ['A'], 'up_to_down': ['A']}
+
+
+def _write(path, data, mtime):
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_reloads_only_changed_packs(tmp_path):
+    _write(tmp_path / 'a.json', [LEVEL], 1)
+    _write(tmp_path / 'b.json', [LEVEL], 1)
+    watcher = PackWatcher(tmp_path, poll_interval=0)
+    pack_a, pack_b = watcher.packs.values()
+    assert not watcher.poll()
+    _write(tmp_path / 'b.json', [LEVEL, dict(LEVEL, title='new')], 2)
+    assert watcher.poll()
+    new_a, new_b = watcher.packs.values()
+    assert new_a is pack_a
+    assert len(new_b) == 2 and new_b[0] is pack_b[0]  # The unchanged level is reused.
+
+
+def test_malformed_packs_keep_previous_version(tmp_path):
+    _write(tmp_path / 'a.json', [LEVEL], 1)
+    watcher = PackWatcher(tmp_path, poll_interval=0)
+    pack = watcher.packs[tmp_path / 'a.json']
+    _write(tmp_path / 'a.json', {'title': 'x'}, 2)
+    assert not watcher.poll()
+    assert watcher.packs[tmp_path / 'a.json'] is pack
+
+
+def test_malformed_levels_are_rejected(tmp_path):
+    _write(tmp_path / 'a.json', [LEVEL, {'title': 'bad', 'up_to_down': 5}, 'level'], 1)
+    pack = PackWatcher(tmp_path, poll_interval=0).packs[tmp_path / 'a.json']
+    assert len(pack) == 1
+    assert [title for title, report in pack.rejected_levels] == ['bad', None]
+
+
+def test_huge_repeat_counts_are_rejected(tmp_path):
+    huge = {'title': 'huge', 'left_to_right': ['A{4294967296}'], 'up_to_down': ['A']}
+    _write(tmp_path / 'a.json', [LEVEL, huge], 1)
+    pack = PackWatcher(tmp_path, poll_interval=0).packs[tmp_path / 'a.json']
+    assert len(pack) == 1
+    [(title, report)] = pack.rejected_levels
+    assert title == 'huge'
+    assert report.impossible_patterns[0].startswith('A{4294967296} (')
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from regex_crossword import pack_writer
+from regex_crossword.level_pack import PARTIAL_SUFFIX
+from regex_crossword.pack_writer import PackWriter
+
+LEVELS = [
+    {'title': f'level {i}', 'left_to_right': ['A', 'B|C'], 'up_to_down': ['[AB]', '.']}
+    for i in range(20)
+]
+
+
+@pytest.fixture(params=[pack_writer.RECOVER_CHUNK_SIZE, 7])
+def chunk_size(request, monkeypatch):
+    # A tiny chunk size makes levels and separators straddle the chunks they are read in.
+    monkeypatch.setattr(pack_writer, 'RECOVER_CHUNK_SIZE', request.param)
+    return request.param
+
+
+def _write(path, levels, *, finish=True) -> PackWriter:
+    writer = PackWriter(path, fsync_every=3)
+    writer.open()
+    for level in levels:
+        writer.write(level)
+    if finish:
+        writer.finish()
+    writer.close()
+    return writer
+
+
+def test_output_matches_json_dumps(tmp_path):
+    _write(tmp_path / 'pack.json', LEVELS)
+    assert (tmp_path / 'pack.json').read_text() == json.dumps(LEVELS, indent=4)
+    _write(tmp_path / 'empty.json', [])
+    assert (tmp_path / 'empty.json').read_text() == json.dumps([], indent=4)
+
+
+def test_level_cut_off_midway_is_dropped(tmp_path, chunk_size):
+    path = tmp_path / 'pack.json'
+    _write(path, LEVELS[:5], finish=False)
+    partial_path = path.with_suffix(PARTIAL_SUFFIX)
+    complete_text = partial_path.read_text()
+    with partial_path.open('a') as partial_file:
+        partial_file.write(',\n' + json.dumps(LEVELS[5], indent=4)[:-10])  # Crash mid-write.
+    writer = PackWriter(path)
+    assert writer.open() == 5
+    writer.close()
+    assert partial_path.read_text() == complete_text
+    writer.open()
+    for level in LEVELS[5:]:
+        writer.write(level)
+    writer.finish()
+    assert path.read_text() == json.dumps(LEVELS, indent=4)
+    assert not partial_path.exists()
+
+
+def test_crash_before_replacing_pack_is_resumed(tmp_path, chunk_size):
+    path = tmp_path / 'pack.json'
+    partial_path = path.with_suffix(PARTIAL_SUFFIX)
+    # The array was closed, but the partial file wasn't renamed over the pack yet.
+    partial_path.write_text(json.dumps(LEVELS, indent=4))
+    writer = PackWriter(path)
+    assert writer.open() == len(LEVELS)
+    writer.finish()
+    assert path.read_text() == json.dumps(LEVELS, indent=4)
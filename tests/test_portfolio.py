@@ -0,0 +1,19 @@
+import os
+
+from regex_crossword import portfolio
+from regex_crossword.level import Level
+
+LEVEL = Level({'left_to_right': ['A|B', 'C'], 'up_to_down': ['[AC]{2}']})
+
+
+def test_first_solution_wins():
+    result = portfolio.solve_portfolio(LEVEL)
+    assert result.strategy in portfolio.STRATEGIES
+    assert LEVEL.check_matrix(result.solution)
+
+
+def test_dead_strategies_leave_the_race(monkeypatch):
+    monkeypatch.setitem(portfolio.STRATEGIES, 'crash', lambda level: os._exit(1))
+    assert portfolio.solve_portfolio(LEVEL, ['crash']).solution is None
+    result = portfolio.solve_portfolio(LEVEL, ['crash', 'propagation'])
+    assert result.strategy == 'propagation'
@@ -0,0 +1,65 @@
+import pytest
+
+from regex_crossword.level import Level
+from regex_crossword.solver import Solver
+from regex_crossword.topology import DIRECTIONS, Topology
+
+HONEYCOMB = {
+    'title': 'Honeycomb',
+    'shape': 'hexagonal',
+    'left_to_right': ['AB', 'CDE', 'FG'],
+    'up_left_to_down_right': ['CF', 'ADG', 'BE'],
+    'up_right_to_down_left': ['AC', 'BDF', 'EG'],
+}  # The example level of the README.
+
+
+def test_topology_is_abstract():
+    with pytest.raises(TypeError):
+        Topology(0, 0, [], [])
+
+
+def test_hexagonal_level_lines():
+    level = Level(
+        {
+            'shape': 'hexagonal',
+            'left_to_right': ['A.', 'B..', 'C.'],
+            'up_left_to_down_right': ['..', '...', '..'],
+            'up_right_to_down_left': ['..', '...', '..'],
+        }
+    )
+    assert len(level.topology.cells) == 7
+    assert [len(line.cells) for line in level.topology.lines] == [2, 3, 2] * 3
+
+
+def test_hexagonal_moves():
+    topology = Level(HONEYCOMB).topology
+    # The middle cell has neighbours on every side, up and down move to the nearest cell on the left.
+    moves = {direction: topology.move((1, 1), direction) for direction in DIRECTIONS}
+    assert moves == {'up': (0, 1), 'down': (2, 0), 'left': (1, 0), 'right': (1, 2)}
+    # Edge cells move along their row and to the nearest cell of the next one.
+    assert topology.move((0, 2), 'down') == (1, 1)
+    assert topology.move((1, 2), 'up') == (0, 2)
+    assert topology.move((2, 1), 'up') == (1, 1)
+    off_level_moves = [((0, 1), 'up'), ((0, 1), 'left'), ((1, 2), 'right'), ((2, 0), 'down')]
+    for cell, direction in off_level_moves:
+        with pytest.raises(IndexError):
+            topology.move(cell, direction)
+
+
+def test_hexagonal_level_solves_and_renders():
+    level = Level(HONEYCOMB)
+    solution = Solver(level).solve()
+    assert solution is not None and level.topology.check_matrix(solution)
+    assert level.topology.render(solution) == '\n'.join(
+        [
+            '    / \\ / \\',
+            '   | A | B |',
+            '  / \\ / \\ / \\',
+            ' | C | D | E |',
+            '  \\ / \\ / \\ /',
+            '   | F | G |',
+            '    \\ / \\ /',
+        ]
+    )
+    solution[1][1] = 'X'
+    assert not level.topology.check_matrix(solution)